@@ -0,0 +1,65 @@
+from langchain_core.callbacks import AsyncCallbackHandler
+from backend.agent.history import message_tokens
+from backend.utils.metrics import llm_call_seconds, tool_seconds
+from typing import Any, Dict, List
+from uuid import UUID
+import time
+
+
+class TokenUsageCallback(AsyncCallbackHandler):
+    def __init__(self):
+        self.llm_rounds = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_prompt_tokens = 0
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], **kwargs: Any):
+        self.llm_rounds += 1
+        self.estimated_prompt_tokens += sum(message_tokens(batch) for batch in messages)
+
+    async def on_llm_end(self, response, **kwargs: Any):
+        usage = (response.llm_output or {}).get("usage") or {}
+        self.prompt_tokens += int(usage.get("prompt_tokens", 0) or 0)
+        self.completion_tokens += int(usage.get("completion_tokens", 0) or 0)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "llm_rounds": self.llm_rounds,
+            "prompt_tokens": self.prompt_tokens or self.estimated_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "estimated_prompt_tokens": self.estimated_prompt_tokens
+        }
+
+
+class MetricsCallback(AsyncCallbackHandler):
+    """Times each chat model call and tool run into the /metrics histograms."""
+
+    def __init__(self):
+        self._started: Dict[UUID, tuple] = {}
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any):
+        model = (kwargs.get("invocation_params") or {}).get("model_id") or (serialized.get("id") or ["unknown"])[-1]
+        self._started[run_id] = ({"model": model}, time.perf_counter())
+
+    async def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        self._finish(llm_call_seconds, run_id, "ok")
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._finish(llm_call_seconds, run_id, "error")
+
+    async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any):
+        self._started[run_id] = ({"tool": serialized.get("name", "unknown")}, time.perf_counter())
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any):
+        status = "error" if str(output).startswith("Error") else "ok"
+        self._finish(tool_seconds, run_id, status)
+
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._finish(tool_seconds, run_id, "error")
+
+    def _finish(self, histogram, run_id: UUID, status: str):
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        labels, start = started
+        histogram.observe(time.perf_counter() - start, status=status, **labels)
@@ -0,0 +1,102 @@
+from langchain.schema import AIMessage, BaseMessage, HumanMessage
+from typing import Dict, List
+import os
+
+BOOKING_FACT_LABELS = {
+    "patient_name": "Patient name",
+    "patient_email": "Patient email",
+    "booking_uuid": "Booking UUID",
+    "scheduled_event_uuid": "Scheduled event UUID",
+    "slot_time": "Appointment time",
+    "status": "Booking status"
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def message_tokens(messages: List[BaseMessage]) -> int:
+    return sum(estimate_tokens(str(message.content)) + 4 for message in messages)
+
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    turns = []
+    for message in messages:
+        if message.type == "human" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class HistoryPolicy:
+    def __init__(self, max_turns: int = 6, token_budget: int = 1500, summary_chars: int = 160, summary_budget: int = 300):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summary_chars = summary_chars
+        self.summary_budget = summary_budget
+
+    def booking_facts(self, booking_data: Dict) -> List[str]:
+        facts = dict(booking_data)
+        if facts.get("event_uri") and not facts.get("scheduled_event_uuid"):
+            facts["scheduled_event_uuid"] = str(facts["event_uri"]).rstrip("/").split("/")[-1]
+        return [
+            f"{label}: {facts[key]}"
+            for key, label in BOOKING_FACT_LABELS.items()
+            if facts.get(key)
+        ]
+
+    def compact_turns(self, turns: List[List[BaseMessage]]) -> List[str]:
+        lines = []
+        used = 0
+        for turn in reversed(turns):
+            parts = []
+            for message in turn:
+                speaker = "Patient" if message.type == "human" else "Assistant"
+                parts.append(f"{speaker}: {_clip(message.content, self.summary_chars)}")
+            line = " | ".join(parts)
+            cost = estimate_tokens(line)
+            if used + cost > self.summary_budget:
+                break
+            lines.append(line)
+            used += cost
+        lines.reverse()
+        return lines
+
+    def build(self, messages: List[BaseMessage], booking_data: Dict) -> List[BaseMessage]:
+        turns = split_turns(messages)
+        recent = turns[-self.max_turns:] if self.max_turns > 0 else []
+        older = turns[:len(turns) - len(recent)]
+        
+        while len(recent) > 1 and message_tokens([m for turn in recent for m in turn]) > self.token_budget:
+            older.append(recent.pop(0))
+        
+        context = []
+        facts = self.booking_facts(booking_data)
+        if facts:
+            context.append("Known booking facts (authoritative):\n" + "\n".join(f"- {fact}" for fact in facts))
+        summary = self.compact_turns(older)
+        if summary:
+            context.append("Earlier in this conversation:\n" + "\n".join(f"- {line}" for line in summary))
+        
+        history = []
+        if context:
+            history.append(HumanMessage(content="[Conversation context]\n" + "\n\n".join(context)))
+            history.append(AIMessage(content="Noted."))
+        for turn in recent:
+            history.extend(turn)
+        return history
+
+
+def create_history_policy() -> HistoryPolicy:
+    return HistoryPolicy(
+        max_turns=int(os.getenv("HISTORY_MAX_TURNS", "6")),
+        token_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "1500")),
+        summary_budget=int(os.getenv("HISTORY_SUMMARY_TOKEN_BUDGET", "300"))
+    )
@@ -1,21 +1,30 @@
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+import os
 
-def get_agent_prompt():
-    from datetime import datetime
-    from zoneinfo import ZoneInfo
-    import os
+DYNAMIC_CONTEXT_TEMPLATE = """CURRENT DATE: {current_day} ({current_date}) - {timezone} timezone
+IMPORTANT: Any date AFTER {current_date} is in the FUTURE and is valid for booking. Only dates BEFORE {current_date} are past dates."""
+
+def get_prompt_variables():
+    timezone = os.getenv("TIMEZONE", "Asia/Kolkata")
+    now = datetime.now(ZoneInfo(timezone))
+    return {
+        "current_date": now.strftime('%Y-%m-%d'),
+        "current_day": now.strftime('%A, %B %d, %Y'),
+        "timezone": timezone
+    }
+
+@lru_cache(maxsize=1)
+def get_static_system_prompt():
     timezone = os.getenv("TIMEZONE", "Asia/Kolkata")
-    tz = ZoneInfo(timezone)
-    current_date = datetime.now(tz).strftime('%Y-%m-%d')
-    current_day = datetime.now(tz).strftime('%A, %B %d, %Y')
     clinic_name = os.getenv("CLINIC_NAME", "HealthCare Plus Medical Center")
     clinic_phone = os.getenv("CLINIC_PHONE", "(555) 123-4567")
     
-    system_message = f"""You are a medical appointment scheduling assistant for {clinic_name}.
+    return f"""You are a medical appointment scheduling assistant for {clinic_name}.
 
-CURRENT DATE: {current_day} ({current_date}) - {timezone} timezone
-IMPORTANT: Any date AFTER {current_date} is in the FUTURE and is valid for booking.
-All times are displayed in {timezone} timezone.
+All times are displayed in {timezone} timezone. The current date is given at the end of these instructions.
 
 ROLE: Schedule appointments efficiently while being warm and professional. You are NOT a medical professional - focus only on scheduling.
 
@@ -30,6 +39,8 @@ BOOKING FLOW:
 2. Recommend appointment type: "For [concern], I'd recommend a [type]. Does that sound appropriate, or would you prefer a longer Specialist Consultation? Confirm the type before proceeding."
 3. Get timing: "When would you like to come in? Morning or afternoon?"
 4. Show 3-5 available slots from get_availability_tool
+   (if the patient is flexible on type or dates, e.g. "30 or 45 minutes, next two weeks", make ONE call with comma-separated appointment types and days)
+   (if the patient names a specific time, e.g. "around 3:30 PM", pass it as preferred_time with AM/PM to get the closest slots)
 5. Collect: full name, email, phone number (all three required)
 6. Confirm all details, then book with book_appointment_tool
 7. Provide confirmation with booking UUID
@@ -59,7 +70,7 @@ CRITICAL RULES:
 ✓ Always confirm before booking
 ✓ Use YYYY-MM-DD format for dates
 ✓ Handle "this week", "tomorrow", "ASAP" by converting to specific dates
-✓ Today is {current_date} - any date after this is valid for booking
+✓ Any date on or after the CURRENT DATE is valid for booking
 
 ✗ NO medical assessment questions ("How long?", "Other symptoms?")
 ✗ NO re-asking provided information
@@ -76,7 +87,7 @@ EDGE CASES:
 ERROR HANDLING:
 - Invalid booking UUID: "I couldn't find that booking. Can you check your confirmation email?"
 - Tool failures: "I'm having trouble accessing the system. Please call {clinic_phone}."
-- Past dates: Only dates BEFORE {current_date} are past dates. Dates on or after {current_date} are valid
+- Past dates: Only dates BEFORE the CURRENT DATE are past dates. Dates on or after it are valid
 
 CONVERSATION TONE:
 Warm, efficient, professional. Brief empathy, then move to action.
@@ -85,10 +96,15 @@ Example: "I understand. Let's get you scheduled with a doctor."
 TOOL PARAMETERS:
 - date_preference: YYYY-MM-DD
 - appointment_type: Exact match required
-- slot_time: From availability results
+- slot_time: Date and time exactly as listed in availability results, "YYYY-MM-DD HH:MM AM/PM" (event_type_uri and start_time_iso are filled in automatically)
 - patient_notes: Brief reason (e.g., "headaches")
 - booking_uuid: From confirmation or conversation"""
 
+@lru_cache(maxsize=1)
+def get_agent_prompt():
+    static_prefix = get_static_system_prompt().replace("{", "{{").replace("}", "}}")
+    system_message = f"{static_prefix}\n\n{DYNAMIC_CONTEXT_TEMPLATE}"
+    
     prompt = ChatPromptTemplate.from_messages([
         ("system", system_message),
         MessagesPlaceholder(variable_name="chat_history", optional=True),
@@ -0,0 +1,115 @@
+from backend.tools.availability_tool import get_availability_tool
+from backend.tools.faq_tool import search_faq_tool
+from backend.tools.results import current_results
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+import os
+import re
+
+GREETING = re.compile(r"^(hi|hello|hey|hiya|good (morning|afternoon|evening))( there)?[\s!.]*$", re.I)
+THANKS = re.compile(r"^(thanks|thank you|thx|ty|great,? thanks|ok(ay)?,? thanks?)( (so|very) much)?( for (your|the) help)?[\s!.]*$", re.I)
+GOODBYE = re.compile(r"^(bye|goodbye|see you|that'?s all|that is all|no,? that'?s it)[\s!.]*$", re.I)
+EMAIL = re.compile(r"^\s*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})\s*$")
+UUID = re.compile(r"^\s*([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[A-Za-z0-9]{16,})\s*$")
+ISO_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+AVAILABILITY = re.compile(r"\b(availab\w*|open slots?|free slots?|slots?|openings?)\b", re.I)
+TIME_PREFERENCE = re.compile(r"\b(morning|afternoon|evening)\b", re.I)
+SCHEDULING_WORDS = re.compile(r"\b(book|schedul\w*|reschedul\w*|cancel\w*|appointment|slot|availab\w*)\b", re.I)
+FAQ_QUESTION = re.compile(
+    r"^(what|where|when|how|do|does|is|are|can)\b.*\b(hours|open|parking|park|address|located|location|directions|insurance|payment|pay|billing|bring|cancellation policy|phone number|email address)\b[^.!]*\??$",
+    re.I
+)
+APPOINTMENT_TYPES = ["general consultation", "follow-up", "physical exam", "specialist consultation"]
+
+
+class IntentRouter:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.counts = Counter()
+
+    def _handled(self, intent: str, response: str) -> Dict:
+        self.counts[intent] += 1
+        return {"intent": intent, "response": response}
+
+    def _appointment_type(self, message: str) -> Optional[str]:
+        lowered = message.lower().replace("follow up", "follow-up")
+        matches = [name for name in APPOINTMENT_TYPES if name in lowered]
+        return matches[0].title() if len(matches) == 1 else None
+
+    def _availability_reply(self, data: Dict) -> str:
+        times_by_date = {}
+        for slot in data.get("slots", []):
+            slot_time = datetime.strptime(slot["time"], "%Y-%m-%d %I:%M %p")
+            times = times_by_date.setdefault(slot_time.strftime("%A, %B %d"), [])
+            label = slot_time.strftime("%I:%M %p").lstrip("0")
+            if label not in times:
+                times.append(label)
+        preference = data.get("time_preference", "any")
+        when = f" {preference}" if preference != "any" else ""
+        lines = [f"- {date}: {', '.join(times)}" for date, times in times_by_date.items()]
+        return f"Here are the open{when} times for a {data.get('appointment_type', 'visit')}:\n" + "\n".join(lines) + "\nWhich of these works best for you?"
+
+    async def route(self, message: str, booking_data: Dict, config: Optional[Dict] = None, last_reply: str = "") -> Optional[Dict]:
+        self.counts["total"] += 1
+        if not self.enabled:
+            self.counts["agent"] += 1
+            return None
+        
+        text = message.strip()
+        clinic_name = os.getenv("CLINIC_NAME", "HealthCare Plus Medical Center")
+        
+        if GREETING.match(text):
+            return self._handled("greeting", f"Hello! Welcome to {clinic_name}. I can help you book, reschedule or cancel an appointment, or answer questions about the clinic. What brings you in today?")
+        # "ok thanks" can be an answer to the agent's question mid-booking,
+        # so canned closings only apply when no flow is in progress.
+        idle = not booking_data.get("offered_slots") and not last_reply.rstrip().endswith("?")
+        if idle and THANKS.match(text):
+            return self._handled("thanks", "You're welcome! Is there anything else I can help you with?")
+        if idle and GOODBYE.match(text):
+            return self._handled("goodbye", "Thank you for contacting us. Take care, and we look forward to seeing you!")
+        
+        email = EMAIL.match(text)
+        if email:
+            booking_data["patient_email"] = email.group(1)
+            self.counts["enriched"] += 1
+        elif UUID.match(text) and not text.isalpha():
+            booking_data["booking_uuid"] = UUID.match(text).group(1)
+            self.counts["enriched"] += 1
+        
+        date = ISO_DATE.search(text)
+        appointment_type = self._appointment_type(text)
+        if date and appointment_type and AVAILABILITY.search(text):
+            preference = TIME_PREFERENCE.search(text)
+            recorded = len(current_results())
+            await get_availability_tool.ainvoke({
+                "date_preference": date.group(1),
+                "appointment_type": appointment_type,
+                "time_preference": preference.group(1).lower() if preference else "any"
+            }, config=config)
+            # Errors and empty results record nothing; the agent explains those.
+            results = current_results()[recorded:]
+            if results and results[-1].data.get("slots"):
+                return self._handled("availability", self._availability_reply(results[-1].data))
+        
+        if FAQ_QUESTION.match(text) and not SCHEDULING_WORDS.search(text):
+            answer = await search_faq_tool.ainvoke({"question": text}, config=config)
+            return self._handled("faq", str(answer))
+        
+        self.counts["agent"] += 1
+        return None
+
+    def stats(self) -> Dict:
+        total = self.counts["total"]
+        handled = total - self.counts["agent"]
+        return {
+            "total": total,
+            "handled": handled,
+            "handled_fraction": handled / total if total else 0.0,
+            "enriched": self.counts["enriched"],
+            "by_intent": {k: v for k, v in self.counts.items() if k not in ("total", "agent", "enriched")}
+        }
+
+
+def create_intent_router() -> IntentRouter:
+    return IntentRouter(enabled=os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true")
@@ -1,40 +1,35 @@
-from langchain_aws import ChatBedrock
 from langchain.agents import create_tool_calling_agent, AgentExecutor
-from langchain.memory import ConversationBufferMemory
-from backend.agent.prompts import get_agent_prompt
+from backend.agent.prompts import get_agent_prompt, get_prompt_variables
+from backend.agent.session_store import create_session_store
+from backend.agent.history import create_history_policy, message_tokens
+from backend.agent.callbacks import TokenUsageCallback, MetricsCallback
+from backend.agent.tracing import trace_sampler
+from backend.agent.router import create_intent_router
 from backend.tools.availability_tool import get_availability_tool
 from backend.tools.booking_tool import book_appointment_tool
 from backend.tools.reschedule_tool import reschedule_appointment_tool
 from backend.tools.cancel_tool import cancel_appointment_tool
 from backend.tools.faq_tool import search_faq_tool
-import os
-import json
-import re
-import boto3
-from botocore.config import Config
+from backend.tools.results import start_tool_context, end_tool_context
+from backend.utils.bedrock import RateLimitedChatBedrock, get_bedrock_client, bedrock_lane
+from backend.utils.metrics import agent_llm_rounds, agent_tokens_total, chat_turns_total
+
+TOOL_PROGRESS_MESSAGES = {
+    "get_availability_tool": "Checking availability…",
+    "book_appointment_tool": "Booking your appointment…",
+    "reschedule_appointment_tool": "Rescheduling your appointment…",
+    "cancel_appointment_tool": "Cancelling your appointment…",
+    "search_faq_tool": "Looking that up…"
+}
+
+def chunk_text(chunk) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, list):
+        return "".join(item.get("text", "") if isinstance(item, dict) else str(item) for item in content)
+    return content or ""
 
 class SchedulingAgent:
-    def __init__(self):
-        retry_config = Config(
-            retries={
-                'max_attempts': 3,
-                'mode': 'adaptive'
-            }
-        )
-        
-        bedrock_client = boto3.client(
-            service_name='bedrock-runtime',
-            region_name=os.getenv("AWS_REGION", "us-east-1"),
-            config=retry_config
-        )
-        
-        self.llm = ChatBedrock(
-            client=bedrock_client,
-            model="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
-            model_kwargs={"temperature": 0.7, "max_tokens": 2000},
-            streaming=False
-        )
-        
+    def __init__(self, llm=None):
         self.tools = [
             get_availability_tool,
             book_appointment_tool,
@@ -44,96 +39,183 @@ class SchedulingAgent:
         ]
         
         self.prompt = get_agent_prompt()
+        self.use_llm(llm or RateLimitedChatBedrock(
+            client=get_bedrock_client(),
+            model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+            model_kwargs={"temperature": 0.7, "max_tokens": 2000},
+            streaming=False
+        ))
         
+        self.sessions = create_session_store()
+        self.history_policy = create_history_policy()
+        self.router = create_intent_router()
+    
+    def use_llm(self, llm):
+        self.llm = llm
         self.agent = create_tool_calling_agent(
             llm=self.llm,
             tools=self.tools,
             prompt=self.prompt
         )
         
-        self.sessions = {}
-    
-    def get_memory(self, session_id: str):
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {
-                "memory": ConversationBufferMemory(
-                    memory_key="chat_history",
-                    return_messages=True
-                ),
-                "booking_data": {}
-            }
-        return self.sessions[session_id]["memory"]
-    
-    def get_booking_data(self, session_id: str):
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {
-                "memory": ConversationBufferMemory(
-                    memory_key="chat_history",
-                    return_messages=True
-                ),
-                "booking_data": {}
-            }
-        return self.sessions[session_id]["booking_data"]
-    
-    def update_booking_data(self, session_id: str, data: dict):
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {
-                "memory": ConversationBufferMemory(
-                    memory_key="chat_history",
-                    return_messages=True
-                ),
-                "booking_data": {}
-            }
-        self.sessions[session_id]["booking_data"].update(data)
-    
-    def clear_booking_data(self, session_id: str):
-        if session_id in self.sessions:
-            self.sessions[session_id]["booking_data"] = {}
-
-    async def process_message(self, message: str, session_id: str):
-        memory = self.get_memory(session_id)
-        
-        agent_executor = AgentExecutor(
+        self.agent_executor = AgentExecutor(
             agent=self.agent,
             tools=self.tools,
-            memory=memory,
-            verbose=True,
+            verbose=False,
             handle_parsing_errors=True
         )
+    
+    def _start_turn(self, message: str, session_id: str):
+        # Agent turns run in the request's own task, so the lane only applies
+        # to this turn; FAQ lookups switch to the lower-priority lane.
+        bedrock_lane.set("booking")
+        session = self.sessions.get(session_id)
+        full_history = list(session["memory"].chat_memory.messages)
+        chat_history = self.history_policy.build(full_history, session["booking_data"])
+        tool_context = start_tool_context(session["booking_data"])
+        usage = TokenUsageCallback()
+        callbacks = [usage, MetricsCallback()]
+        trace_handler = trace_sampler.handler_for(session_id)
+        if trace_handler is not None:
+            callbacks.append(trace_handler)
         
-        result = await agent_executor.ainvoke({"input": message})
+        return {
+            "session": session,
+            "full_history": full_history,
+            "chat_history": chat_history,
+            "usage": usage,
+            "tool_context": tool_context,
+            "inputs": {"input": message, "chat_history": chat_history, **get_prompt_variables()},
+            "config": {"callbacks": callbacks}
+        }
+    
+    def _apply_tool_results(self, session: dict, results: list):
+        booking_details = None
+        action_performed = None
+        
+        for result in results:
+            if result.kind == "availability":
+                session["booking_data"]["offered_slots"] = result.data.get("slots", [])
+            elif result.kind in ("booking", "reschedule"):
+                booking_details = result.data
+                session["booking_data"].pop("offered_slots", None)
+                session["booking_data"].update(result.data)
+                action_performed = result.kind
+            elif result.kind == "cancellation":
+                booking_details = None
+                session["booking_data"] = {}
+                action_performed = "cancellation"
+        
+        return booking_details, action_performed
+    
+    def _finish_turn(self, message: str, session_id: str, turn: dict, output):
+        session = turn["session"]
         
-        output = result.get("output", "")
         if isinstance(output, list):
             response_text = "".join([item.get("text", "") if isinstance(item, dict) else str(item) for item in output])
         else:
             response_text = str(output)
         
-        booking_details = None
-        action_performed = None
+        booking_details, action_performed = self._apply_tool_results(session, turn["tool_context"].results)
+        end_tool_context()
         
-        if "BOOKING_DATA:" in response_text:
-            match = re.search(r'BOOKING_DATA: ({.*?})', response_text)
-            if match:
-                try:
-                    booking_details = json.loads(match.group(1))
-                    self.update_booking_data(session_id, booking_details)
-                    action_performed = "booking"
-                    response_text = response_text.replace(f"BOOKING_DATA: {match.group(1)}", "").strip()
-                except:
-                    pass
-        
-        if "CANCELLED_BOOKING:" in response_text:
-            match = re.search(r'CANCELLED_BOOKING: (\S+)', response_text)
-            if match:
-                self.clear_booking_data(session_id)
-                action_performed = "cancellation"
-                response_text = response_text.replace(f"CANCELLED_BOOKING: {match.group(1)}", "").strip()
+        session["memory"].save_context({"input": message}, {"output": response_text.strip()})
+        self.sessions.save(session_id, session)
+        
+        usage_summary = turn["usage"].summary()
+        usage_summary["history_tokens"] = message_tokens(turn["chat_history"])
+        usage_summary["full_history_tokens"] = message_tokens(turn["full_history"])
+        agent_llm_rounds.observe(usage_summary["llm_rounds"])
+        agent_tokens_total.inc(usage_summary["prompt_tokens"], kind="prompt")
+        agent_tokens_total.inc(usage_summary["completion_tokens"], kind="completion")
+        agent_tokens_total.inc(usage_summary["history_tokens"], kind="history")
+        chat_turns_total.inc(path="agent")
         
         return {
             "response": response_text.strip(),
             "booking_details": booking_details,
-            "action_performed": action_performed
+            "action_performed": action_performed,
+            "usage": usage_summary
         }
 
+    def _abort_turn(self, message: str, session_id: str, turn: dict):
+        """Keep what tools already did when a turn fails or its client goes away."""
+        session = turn["session"]
+        results = turn["tool_context"].results
+        self._apply_tool_results(session, results)
+        end_tool_context()
+        if results:
+            session["memory"].save_context({"input": message}, {"output": "\n\n".join(result.summary for result in results)})
+        self.sessions.save(session_id, session)
+
+    async def _route(self, message: str, session_id: str):
+        session = self.sessions.get(session_id)
+        tool_context = start_tool_context(session["booking_data"])
+        try:
+            messages = session["memory"].chat_memory.messages
+            last_reply = str(messages[-1].content) if messages and messages[-1].type == "ai" else ""
+            routed = await self.router.route(message, session["booking_data"], config={"callbacks": [MetricsCallback()]}, last_reply=last_reply)
+        finally:
+            end_tool_context()
+        if routed is None:
+            return None
+        
+        chat_turns_total.inc(path="router")
+        booking_details, action_performed = self._apply_tool_results(session, tool_context.results)
+        session["memory"].save_context({"input": message}, {"output": routed["response"]})
+        self.sessions.save(session_id, session)
+        return {
+            "response": routed["response"],
+            "booking_details": booking_details,
+            "action_performed": action_performed,
+            "usage": {"llm_rounds": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        }
+
+    async def process_message(self, message: str, session_id: str):
+        routed = await self._route(message, session_id)
+        if routed is not None:
+            return routed
+        
+        turn = self._start_turn(message, session_id)
+        try:
+            result = await self.agent_executor.ainvoke(turn["inputs"], config=turn["config"])
+        except BaseException:
+            self._abort_turn(message, session_id, turn)
+            raise
+        return self._finish_turn(message, session_id, turn, result.get("output", ""))
+
+    async def stream_message(self, message: str, session_id: str):
+        routed = await self._route(message, session_id)
+        if routed is not None:
+            yield {"type": "final", **routed}
+            return
+        
+        turn = self._start_turn(message, session_id)
+        root_run_id = None
+        output = ""
+        
+        # Closing the generator (client disconnect) raises GeneratorExit at a
+        # yield; tool results such as a booking must still reach the session.
+        try:
+            async for event in self.agent_executor.astream_events(turn["inputs"], config=turn["config"], version="v1"):
+                kind = event["event"]
+                if root_run_id is None and kind == "on_chain_start":
+                    root_run_id = event["run_id"]
+                elif kind == "on_chat_model_stream":
+                    text = chunk_text(event["data"].get("chunk"))
+                    if text:
+                        yield {"type": "token", "text": text}
+                elif kind == "on_tool_start":
+                    yield {"type": "progress", "tool": event["name"], "message": TOOL_PROGRESS_MESSAGES.get(event["name"], "Working on it…")}
+                elif kind == "on_tool_end":
+                    yield {"type": "tool_end", "tool": event["name"]}
+                elif kind == "on_chain_end" and event["run_id"] == root_run_id:
+                    output = (event["data"].get("output") or {}).get("output", "")
+        except BaseException:
+            self._abort_turn(message, session_id, turn)
+            raise
+        
+        result = self._finish_turn(message, session_id, turn, output)
+        yield {"type": "final", **result}
+
 agent_instance = SchedulingAgent()
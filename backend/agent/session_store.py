@@ -0,0 +1,280 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from langchain.memory import ConversationBufferMemory
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
+from typing import Callable, Dict, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+_MESSAGE_TYPES = {"human": HumanMessage, "ai": AIMessage, "system": SystemMessage}
+
+
+def new_session() -> Dict:
+    return {
+        "memory": ConversationBufferMemory(
+            memory_key="chat_history",
+            return_messages=True
+        ),
+        "booking_data": {}
+    }
+
+
+def estimate_session_bytes(session: Dict) -> int:
+    messages = session["memory"].chat_memory.messages
+    size = sum(len(str(message.content)) for message in messages)
+    return size + len(json.dumps(session["booking_data"], default=str))
+
+
+def serialize_session(session: Dict) -> bytes:
+    messages = [[message.type, message.content] for message in session["memory"].chat_memory.messages]
+    payload = json.dumps({"m": messages, "b": session["booking_data"]}, separators=(",", ":"), default=str)
+    return zlib.compress(payload.encode("utf-8"))
+
+
+def deserialize_session(blob: bytes) -> Dict:
+    payload = json.loads(zlib.decompress(blob).decode("utf-8"))
+    session = new_session()
+    session["memory"].chat_memory.messages = [
+        _MESSAGE_TYPES.get(message_type, HumanMessage)(content=content)
+        for message_type, content in payload.get("m", [])
+    ]
+    session["booking_data"] = payload.get("b", {})
+    return session
+
+
+class SessionStore(ABC):
+    @abstractmethod
+    def get(self, session_id: str) -> Dict:
+        ...
+
+    @abstractmethod
+    def peek(self, session_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def save(self, session_id: str, session: Optional[Dict] = None):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        ...
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.peek(session_id) is not None
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self, max_sessions: int = 10000, idle_ttl: float = 3600, max_memory_bytes: int = 0, clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_memory_bytes = max_memory_bytes
+        self._clock = clock
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.evictions = {"capacity": 0, "idle": 0, "memory": 0}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _remove(self, session_id: str, reason: Optional[str] = None):
+        self._sessions.pop(session_id, None)
+        self._last_access.pop(session_id, None)
+        self._total_bytes -= self._sizes.pop(session_id, 0)
+        if reason:
+            self.evictions[reason] += 1
+
+    def _expire_idle(self):
+        if self.idle_ttl <= 0:
+            return
+        cutoff = self._clock() - self.idle_ttl
+        while self._sessions:
+            oldest = next(iter(self._sessions))
+            if self._last_access[oldest] > cutoff:
+                break
+            self._remove(oldest, "idle")
+
+    def _enforce_limits(self, keep: Optional[str] = None):
+        while len(self._sessions) > self.max_sessions:
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                break
+            self._remove(oldest, "capacity")
+        if self.max_memory_bytes > 0:
+            while self._total_bytes > self.max_memory_bytes and len(self._sessions) > 1:
+                oldest = next(iter(self._sessions))
+                if oldest == keep:
+                    break
+                self._remove(oldest, "memory")
+
+    def peek(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._expire_idle()
+            return self._sessions.get(session_id)
+
+    def get(self, session_id: str) -> Dict:
+        with self._lock:
+            self._expire_idle()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = new_session()
+                self._sessions[session_id] = session
+                self._sizes[session_id] = 0
+            self._sessions.move_to_end(session_id)
+            self._last_access[session_id] = self._clock()
+            self._enforce_limits(keep=session_id)
+            return session
+
+    def save(self, session_id: str, session: Optional[Dict] = None):
+        with self._lock:
+            if session is not None:
+                self._sessions[session_id] = session
+                self._last_access.setdefault(session_id, self._clock())
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            size = estimate_session_bytes(session)
+            self._total_bytes += size - self._sizes.get(session_id, 0)
+            self._sizes[session_id] = size
+            self._enforce_limits(keep=session_id)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._remove(session_id)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "approx_bytes": self._total_bytes,
+                "evictions": dict(self.evictions)
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path: str, idle_ttl: float = 3600, max_cached: int = 1000, cleanup_interval: int = 500):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.idle_ttl = idle_ttl
+        self.max_cached = max_cached
+        self.cleanup_interval = cleanup_interval
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+        self._conn.commit()
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._saves = 0
+        self.loads = 0
+        self.evictions = {"idle": 0}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _cache_put(self, session_id: str, updated_at: float, session: Dict):
+        self._cache[session_id] = (updated_at, session)
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    def _load(self, session_id: str) -> Optional[Dict]:
+        row = self._conn.execute("SELECT updated_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        cached = self._cache.get(session_id)
+        if row is None:
+            if cached is not None and cached[0] is None:
+                return cached[1]
+            self._cache.pop(session_id, None)
+            return None
+        if cached is not None and cached[0] == row[0]:
+            self._cache.move_to_end(session_id)
+            return cached[1]
+        row = self._conn.execute("SELECT data, updated_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        session = deserialize_session(row[0])
+        self.loads += 1
+        self._cache_put(session_id, row[1], session)
+        return session
+
+    def peek(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._load(session_id)
+
+    def get(self, session_id: str) -> Dict:
+        with self._lock:
+            session = self._load(session_id)
+            if session is None:
+                session = new_session()
+                self._cache_put(session_id, None, session)
+            return session
+
+    def save(self, session_id: str, session: Optional[Dict] = None):
+        with self._lock:
+            if session is None:
+                cached = self._cache.get(session_id)
+                if cached is None:
+                    return
+                session = cached[1]
+            updated_at = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, updated_at) VALUES (?, ?, ?)",
+                (session_id, serialize_session(session), updated_at)
+            )
+            self._conn.commit()
+            self._cache_put(session_id, updated_at, session)
+            self._saves += 1
+            if self.idle_ttl > 0 and self._saves % self.cleanup_interval == 0:
+                self._expire_idle()
+
+    def _expire_idle(self):
+        cursor = self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.idle_ttl,))
+        self._conn.commit()
+        self.evictions["idle"] += cursor.rowcount
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._conn.commit()
+            self._cache.pop(session_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self),
+                "cached": len(self._cache),
+                "loads": self.loads,
+                "evictions": dict(self.evictions)
+            }
+
+
+def create_session_store() -> SessionStore:
+    backend = os.getenv("SESSION_BACKEND", "memory").lower()
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            path=os.getenv("SESSION_DB_PATH", "./data/sessions.sqlite"),
+            idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "3600")),
+            max_cached=int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+    return InMemorySessionStore(
+        max_sessions=int(os.getenv("SESSION_MAX_ENTRIES", "10000")),
+        idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "3600")),
+        max_memory_bytes=int(float(os.getenv("SESSION_MAX_MEMORY_MB", "0")) * 1024 * 1024)
+    )
@@ -0,0 +1,92 @@
+from langchain_core.callbacks import AsyncCallbackHandler
+from typing import Any, Dict, Optional
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from uuid import UUID, uuid4
+import atexit
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+logger = logging.getLogger("backend.agent.trace")
+_listener: Optional[QueueListener] = None
+
+
+def configure_trace_logging():
+    """Send trace lines to AGENT_TRACE_LOG (or stderr) from a background thread."""
+    global _listener
+    if _listener is not None:
+        return
+    path = os.getenv("AGENT_TRACE_LOG")
+    target = logging.FileHandler(path) if path else logging.StreamHandler(sys.stderr)
+    target.setFormatter(logging.Formatter("%(message)s"))
+    queue = SimpleQueue()
+    _listener = QueueListener(queue, target)
+    _listener.start()
+    atexit.register(_listener.stop)
+    logger.addHandler(QueueHandler(queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _preview(value: Any, limit: int = 200) -> str:
+    text = str(value)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+class StructuredTraceHandler(AsyncCallbackHandler):
+    def __init__(self, session_id: str):
+        self.trace_id = uuid4().hex
+        self.session_id = session_id
+        self._started: Dict[UUID, float] = {}
+
+    def _emit(self, event: str, run_id: UUID, **fields: Any):
+        record = {"trace_id": self.trace_id, "session_id": self.session_id, "event": event, "run_id": str(run_id), **fields}
+        logger.info(json.dumps(record, default=str))
+
+    def _elapsed_ms(self, run_id: UUID) -> Optional[float]:
+        started = self._started.pop(run_id, None)
+        return round((time.perf_counter() - started) * 1000, 2) if started is not None else None
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs: Any):
+        self._started[run_id] = time.perf_counter()
+        self._emit("llm_start", run_id, messages=sum(len(batch) for batch in messages))
+
+    async def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        usage = (response.llm_output or {}).get("usage")
+        self._emit("llm_end", run_id, duration_ms=self._elapsed_ms(run_id), usage=usage)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._emit("llm_error", run_id, duration_ms=self._elapsed_ms(run_id), error=_preview(error))
+
+    async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any):
+        self._started[run_id] = time.perf_counter()
+        self._emit("tool_start", run_id, tool=serialized.get("name"), input=_preview(input_str))
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any):
+        self._emit("tool_end", run_id, duration_ms=self._elapsed_ms(run_id), output=_preview(output))
+
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._emit("tool_error", run_id, duration_ms=self._elapsed_ms(run_id), error=_preview(error))
+
+
+class TraceSampler:
+    def __init__(self, sample_rate: float = 0.0):
+        self.sample_rate = 0.0
+        self.set_sample_rate(sample_rate)
+
+    def set_sample_rate(self, sample_rate: float):
+        self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+        if self.sample_rate > 0:
+            configure_trace_logging()
+
+    def handler_for(self, session_id: str) -> Optional[StructuredTraceHandler]:
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        return StructuredTraceHandler(session_id)
+
+
+trace_sampler = TraceSampler(float(os.getenv("AGENT_TRACE_SAMPLE_RATE", "0")))
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Header, HTTPException
+from backend.rag.faq_rag import reload_knowledge_base, faq_stats, semantic_cache
+from backend.agent.scheduling_agent import agent_instance
+from backend.agent.tracing import trace_sampler
+from backend.api.concurrency import admission, session_locks
+from backend.utils.bedrock import bedrock_limiter
+from backend.models.schemas import TraceSettings
+from typing import Optional
+import hmac
+import os
+
+router = APIRouter()
+
+def verify_admin_key(x_admin_key: Optional[str]):
+    admin_key = os.getenv("ADMIN_API_KEY")
+    if not admin_key:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_API_KEY to enable them")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, admin_key):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+@router.post("/admin/reindex")
+async def reindex_endpoint(x_admin_key: Optional[str] = Header(default=None)):
+    verify_admin_key(x_admin_key)
+    try:
+        summary = await reload_knowledge_base()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error re-indexing knowledge base: {str(e)}")
+    return {"status": "ok", **summary}
+
+@router.get("/admin/trace")
+async def get_trace_settings(x_admin_key: Optional[str] = Header(default=None)):
+    verify_admin_key(x_admin_key)
+    return {"sample_rate": trace_sampler.sample_rate}
+
+@router.post("/admin/trace")
+async def update_trace_settings(settings: TraceSettings, x_admin_key: Optional[str] = Header(default=None)):
+    verify_admin_key(x_admin_key)
+    trace_sampler.set_sample_rate(settings.sample_rate)
+    return {"sample_rate": trace_sampler.sample_rate}
+
+@router.get("/admin/stats")
+async def get_stats(x_admin_key: Optional[str] = Header(default=None)):
+    verify_admin_key(x_admin_key)
+    return {
+        "router": agent_instance.router.stats(),
+        "sessions": agent_instance.sessions.stats(),
+        "faq": dict(faq_stats),
+        "faq_semantic_cache": semantic_cache.stats(),
+        "admission": admission.stats(),
+        "session_locks": session_locks.stats(),
+        "bedrock": bedrock_limiter.stats()
+    }
@@ -1,11 +1,72 @@
+import asyncio
 import httpx
 import os
+import time
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from backend.utils.aio import gather_or_cancel
+from backend.utils.cache import TTLCache
+from backend.utils.metrics import calendly_request_seconds, normalize_path
+from backend.utils.slot_index import SlotIndex
 
 load_dotenv()
 
+AVAILABILITY_WINDOW = timedelta(days=7)
+
+_http_client: Optional[httpx.AsyncClient] = None
+_service: Optional["CalendlyService"] = None
+
+
+def _build_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("CALENDLY_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("CALENDLY_MAX_KEEPALIVE_CONNECTIONS", "10")),
+        keepalive_expiry=float(os.getenv("CALENDLY_KEEPALIVE_EXPIRY", "30"))
+    )
+    timeout = httpx.Timeout(
+        connect=float(os.getenv("CALENDLY_CONNECT_TIMEOUT", "5")),
+        read=float(os.getenv("CALENDLY_READ_TIMEOUT", "30")),
+        write=float(os.getenv("CALENDLY_WRITE_TIMEOUT", "30")),
+        pool=float(os.getenv("CALENDLY_POOL_TIMEOUT", "10"))
+    )
+    return httpx.AsyncClient(
+        http2=os.getenv("CALENDLY_HTTP2", "true").lower() == "true",
+        limits=limits,
+        timeout=timeout,
+        transport=transport
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _build_http_client()
+    return _http_client
+
+
+async def open_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    global _http_client
+    if transport is not None:
+        await close_http_client()
+        _http_client = _build_http_client(transport)
+    return get_http_client()
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+def get_calendly_service() -> "CalendlyService":
+    global _service
+    if _service is None:
+        _service = CalendlyService()
+    return _service
+
+
 class CalendlyService:
     def __init__(self):
         self.api_key = os.getenv("CALENDLY_API_KEY")
@@ -18,59 +79,181 @@ class CalendlyService:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self.caches = {
+            "user": TTLCache(ttl=float(os.getenv("CALENDLY_USER_CACHE_TTL", "86400")), max_size=1),
+            "event_types": TTLCache(ttl=float(os.getenv("CALENDLY_EVENT_TYPES_CACHE_TTL", "3600")), max_size=16),
+            "event_type_details": TTLCache(ttl=float(os.getenv("CALENDLY_EVENT_TYPE_DETAILS_CACHE_TTL", "3600")), max_size=256),
+            "availability": TTLCache(ttl=float(os.getenv("CALENDLY_AVAILABILITY_CACHE_TTL", "30")), max_size=256),
+            "slot_index": TTLCache(ttl=float(os.getenv("CALENDLY_AVAILABILITY_CACHE_TTL", "30")), max_size=64)
+        }
+        self._availability_inflight: Dict[tuple, asyncio.Task] = {}
+        self._availability_generation = 0
+
+    def invalidate_cache(self, resource: Optional[str] = None, key: Optional[str] = None):
+        if resource is None:
+            for cache in self.caches.values():
+                cache.clear()
+            self.invalidate_availability()
+            return
+        if resource not in self.caches:
+            raise ValueError(f"Unknown Calendly cache resource: {resource}")
+        if resource == "availability" and key is None:
+            self.invalidate_availability()
+            return
+        self.caches[resource].invalidate(key)
+
+    def invalidate_availability(self):
+        self._availability_generation += 1
+        self._availability_inflight.clear()
+        self.caches["availability"].clear()
+        self.caches["slot_index"].clear()
+
+    def cache_stats(self) -> Dict[str, Dict]:
+        return {name: cache.stats() for name, cache in self.caches.items()}
     
-    async def get_user_uri(self) -> str:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.base_url}/users/me",
-                headers=self.headers
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return get_http_client()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self.client.request(
+                method,
+                f"{self.base_url}{path}",
+                headers=self.headers,
+                **kwargs
             )
-            if response.status_code == 401:
-                raise Exception("Invalid Calendly API token. Please check your CALENDLY_API_KEY in .env file")
-            response.raise_for_status()
-            data = response.json()
-            return data["resource"]["uri"]
+            status = str(response.status_code)
+            return response
+        finally:
+            calendly_request_seconds.observe(
+                time.perf_counter() - started,
+                method=method,
+                endpoint=normalize_path(path),
+                status=status
+            )
+
+    async def get_user_uri(self) -> str:
+        cached = self.caches["user"].get("me")
+        if cached is not None:
+            return cached
+        response = await self._request("GET", "/users/me")
+        if response.status_code == 401:
+            raise Exception("Invalid Calendly API token. Please check your CALENDLY_API_KEY in .env file")
+        response.raise_for_status()
+        data = response.json()
+        user_uri = data["resource"]["uri"]
+        self.caches["user"].set("me", user_uri)
+        return user_uri
     
     async def get_event_types(self) -> List[Dict]:
+        cached = self.caches["event_types"].get("all")
+        if cached is not None:
+            return cached
         user_uri = await self.get_user_uri()
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.base_url}/event_types",
-                headers=self.headers,
-                params={"user": user_uri}
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["collection"]
+        response = await self._request("GET", "/event_types", params={"user": user_uri})
+        response.raise_for_status()
+        data = response.json()
+        event_types = data["collection"]
+        self.caches["event_types"].set("all", event_types)
+        for event_type in event_types:
+            if event_type.get("uri"):
+                self.caches["event_type_details"].set(event_type["uri"].split("/")[-1], event_type)
+        return event_types
     
     async def get_event_type_details(self, event_type_uri: str) -> Dict:
         event_type_uuid = event_type_uri.split("/")[-1]
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.base_url}/event_types/{event_type_uuid}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["resource"]
+        cached = self.caches["event_type_details"].get(event_type_uuid)
+        if cached is not None:
+            return cached
+        response = await self._request("GET", f"/event_types/{event_type_uuid}")
+        response.raise_for_status()
+        data = response.json()
+        details = data["resource"]
+        self.caches["event_type_details"].set(event_type_uuid, details)
+        return details
 
     async def get_availability(self, event_type_uri: str, start_time: str, end_time: str) -> List[Dict]:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.base_url}/event_type_available_times",
-                headers=self.headers,
-                params={
-                    "event_type": event_type_uri,
-                    "start_time": start_time,
-                    "end_time": end_time
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("collection", [])
+        key = (event_type_uri, start_time, end_time)
+        cached = self.caches["availability"].get(key)
+        if cached is not None:
+            return cached
+
+        task = self._availability_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_cache_availability(key, self._availability_generation))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._availability_inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch_windows(self, event_type_uris: List[str], start_time: str, end_time: str, max_concurrency: Optional[int] = None) -> List[tuple]:
+        start = datetime.fromisoformat(start_time)
+        end = datetime.fromisoformat(end_time)
+        windows = []
+        while start < end:
+            window_end = min(start + AVAILABILITY_WINDOW, end)
+            windows.append((start.isoformat(), window_end.isoformat()))
+            start = window_end
+
+        semaphore = asyncio.Semaphore(max_concurrency or int(os.getenv("CALENDLY_AVAILABILITY_CONCURRENCY", "4")))
+
+        async def fetch(event_type_uri: str, window: tuple) -> List[Dict]:
+            async with semaphore:
+                return await self.get_availability(event_type_uri, *window)
+
+        requests = [(uri, window) for uri in dict.fromkeys(event_type_uris) for window in windows]
+        results = await gather_or_cancel(*(fetch(uri, window) for uri, window in requests))
+        return [(uri, slots) for (uri, _), slots in zip(requests, results)]
+
+    async def get_slot_index(self, event_type_uris: List[str], start_time: str, end_time: str, timezone: str, max_concurrency: Optional[int] = None) -> SlotIndex:
+        """Availability for several event types over any range, as a SlotIndex.
+
+        The range is split into the 7-day windows the API accepts and every
+        (event type, window) pair is fetched concurrently through the cached
+        single-flight get_availability. The index is rebuilt only when one
+        of the underlying window results changed, so repeated queries over
+        cached availability reuse it.
+        """
+        parts = await self._fetch_windows(event_type_uris, start_time, end_time, max_concurrency)
+        key = (tuple(dict.fromkeys(event_type_uris)), start_time, end_time, timezone)
+        cached = self.caches["slot_index"].get(key)
+        if cached is not None:
+            cached_parts, index = cached
+            if len(cached_parts) == len(parts) and all(old is new for (_, old), (_, new) in zip(cached_parts, parts)):
+                return index
+        index = SlotIndex.from_windows(event_type_uris, parts, timezone)
+        self.caches["slot_index"].set(key, (parts, index))
+        return index
+
+    async def _fetch_and_cache_availability(self, key: tuple, generation: int) -> List[Dict]:
+        try:
+            slots = await self._fetch_availability(*key)
+            if generation == self._availability_generation:
+                self.caches["availability"].set(key, slots)
+            return slots
+        finally:
+            if self._availability_inflight.get(key) is asyncio.current_task():
+                del self._availability_inflight[key]
+
+    async def _fetch_availability(self, event_type_uri: str, start_time: str, end_time: str) -> List[Dict]:
+        response = await self._request(
+            "GET",
+            "/event_type_available_times",
+            params={
+                "event_type": event_type_uri,
+                "start_time": start_time,
+                "end_time": end_time
+            }
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data.get("collection", [])
     
-    async def create_booking(self, event_type_uri: str, start_time: str, invitee_email: str, invitee_name: str, invitee_notes: str = "", timezone: str = "Asia/Kolkata") -> Dict:
-        event_type_details = await self.get_event_type_details(event_type_uri)
+    async def create_booking(self, event_type_uri: str, start_time: str, invitee_email: str, invitee_name: str, invitee_notes: str = "", timezone: str = "Asia/Kolkata", event_type_details: Optional[Dict] = None) -> Dict:
+        if event_type_details is None:
+            event_type_details = await self.get_event_type_details(event_type_uri)
         locations = event_type_details.get("locations", [])
         
         location_payload = None
@@ -106,49 +289,41 @@ class CalendlyService:
                 {"question": "Reason for visit", "answer": invitee_notes, "position": 0}
             ]
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/invitees",
-                    headers=self.headers,
-                    json=payload
-                )
-                print(f"Calendly Request: {payload}")
-                print(f"Calendly Response Status: {response.status_code}")
-                print(f"Calendly Response: {response.text}")
-                response.raise_for_status()
-                data = response.json()
-                invitee = data["resource"]
-                return {
-                    "uri": invitee.get("uri", ""),
-                    "invitee_uuid": invitee.get("uri", "").split("/")[-1],
-                    "email": invitee.get("email"),
-                    "name": invitee.get("name"),
-                    "status": invitee.get("status", "active"),
-                    "cancel_url": invitee.get("cancel_url", ""),
-                    "reschedule_url": invitee.get("reschedule_url", ""),
-                    "event_uri": invitee.get("event", "")
-                }
-            except httpx.HTTPStatusError as e:
-                print(f"Calendly API Error: {e.response.text}")
-                raise
-    
-    async def get_scheduled_event(self, event_uuid: str) -> Dict:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.base_url}/scheduled_events/{event_uuid}",
-                headers=self.headers
-            )
+        try:
+            response = await self._request("POST", "/invitees", json=payload)
+            self.invalidate_availability()
+            print(f"Calendly Request: {payload}")
+            print(f"Calendly Response Status: {response.status_code}")
+            print(f"Calendly Response: {response.text}")
             response.raise_for_status()
             data = response.json()
-            return data["resource"]
+            invitee = data["resource"]
+            return {
+                "uri": invitee.get("uri", ""),
+                "invitee_uuid": invitee.get("uri", "").split("/")[-1],
+                "email": invitee.get("email"),
+                "name": invitee.get("name"),
+                "status": invitee.get("status", "active"),
+                "cancel_url": invitee.get("cancel_url", ""),
+                "reschedule_url": invitee.get("reschedule_url", ""),
+                "event_uri": invitee.get("event", "")
+            }
+        except httpx.HTTPStatusError as e:
+            print(f"Calendly API Error: {e.response.text}")
+            raise
     
-    async def cancel_invitee(self, invitee_uuid: str, scheduled_event_uuid: str) -> bool:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{self.base_url}/scheduled_events/{scheduled_event_uuid}/invitees/{invitee_uuid}/cancellation",
-                headers=self.headers,
-                json={"reason": "Cancelled by patient"}
-            )
-            response.raise_for_status()
-            return True
+    async def get_scheduled_event(self, event_uuid: str) -> Dict:
+        response = await self._request("GET", f"/scheduled_events/{event_uuid}")
+        response.raise_for_status()
+        data = response.json()
+        return data["resource"]
+    
+    async def cancel_invitee(self, invitee_uuid: str, scheduled_event_uuid: str, reason: str = "Cancelled by patient") -> bool:
+        response = await self._request(
+            "POST",
+            f"/scheduled_events/{scheduled_event_uuid}/invitees/{invitee_uuid}/cancellation",
+            json={"reason": reason}
+        )
+        self.invalidate_availability()
+        response.raise_for_status()
+        return True
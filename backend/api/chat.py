@@ -1,11 +1,46 @@
+from contextlib import AsyncExitStack, aclosing
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from backend.models.schemas import ChatRequest, ChatResponse
 from backend.agent.scheduling_agent import agent_instance
+from backend.api.concurrency import AdmissionRejected, admission, session_locks
+import json
 
 router = APIRouter()
 
+THROTTLED_MESSAGE = "I'm experiencing high demand right now. Please wait a moment and try again."
+
+def is_throttling_error(e: Exception) -> bool:
+    return "ThrottlingException" in str(e) or "Too many requests" in str(e)
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def rejection_error(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=e.status_code,
+        detail=e.reason,
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+async def admit(stack: AsyncExitStack, session_id: str):
+    # Serialize turns per session before taking a global slot, so a session
+    # waiting on its own previous message doesn't hold server capacity.
+    try:
+        await stack.enter_async_context(session_locks.hold(session_id))
+        await stack.enter_async_context(admission.slot())
+    except AdmissionRejected as e:
+        await stack.aclose()
+        raise rejection_error(e)
+
 @router.post("/api/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
+    async with AsyncExitStack() as stack:
+        await admit(stack, request.session_id)
+        return await run_chat(request)
+
+async def run_chat(request: ChatRequest) -> ChatResponse:
     try:
         result = await agent_instance.process_message(
             message=request.message,
@@ -15,7 +50,8 @@ async def chat_endpoint(request: ChatRequest):
         return ChatResponse(
             response=result["response"],
             booking_details=result.get("booking_details"),
-            action_performed=result.get("action_performed")
+            action_performed=result.get("action_performed"),
+            usage=result.get("usage")
         )
     
     except Exception as e:
@@ -23,11 +59,57 @@ async def chat_endpoint(request: ChatRequest):
         print(f"Error: {str(e)}")
         print(traceback.format_exc())
         
-        if "ThrottlingException" in str(e) or "Too many requests" in str(e):
+        if is_throttling_error(e):
             return ChatResponse(
-                response="I'm experiencing high demand right now. Please wait a moment and try again.",
+                response=THROTTLED_MESSAGE,
                 booking_details=None,
                 action_performed=None
             )
         
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+@router.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    stack = AsyncExitStack()
+    await admit(stack, request.session_id)
+    
+    async def event_stream():
+        try:
+            # aclosing() finalizes the agent's generator before the session
+            # lock is released below, even when the client disconnects.
+            async with aclosing(agent_instance.stream_message(
+                message=request.message,
+                session_id=request.session_id
+            )) as events:
+                async for event in events:
+                    event_type = event.pop("type")
+                    if event_type == "final":
+                        payload = ChatResponse(
+                            response=event["response"],
+                            booking_details=event.get("booking_details"),
+                            action_performed=event.get("action_performed"),
+                            usage=event.get("usage")
+                        )
+                        yield sse_event("final", payload.model_dump())
+                    else:
+                        yield sse_event(event_type, event)
+        except Exception as e:
+            import traceback
+            print(f"Error: {str(e)}")
+            print(traceback.format_exc())
+            
+            if is_throttling_error(e):
+                yield sse_event("final", ChatResponse(response=THROTTLED_MESSAGE).model_dump())
+            else:
+                yield sse_event("error", {"detail": f"Error processing request: {str(e)}"})
+        finally:
+            await stack.aclose()
+    
+    # The background task releases the slot if the client disconnects before
+    # the stream is ever iterated; aclose() is a no-op the second time.
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(stack.aclose)
+    )
@@ -0,0 +1,120 @@
+from contextlib import asynccontextmanager
+from backend.utils.metrics import chat_queue_wait_seconds
+from typing import Dict
+import asyncio
+import math
+import os
+import time
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int, status_code: int = 503):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 32, queue_timeout: float = 15.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._avg_service_seconds = 5.0
+
+    def retry_after(self) -> int:
+        backlog = (self.waiting + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(backlog * self._avg_service_seconds))
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.active + self.waiting >= self.max_concurrent + self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected("Server is at capacity", self.retry_after())
+        
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise AdmissionRejected("Timed out waiting for capacity", self.retry_after())
+        finally:
+            self.waiting -= 1
+        
+        waited = time.monotonic() - started
+        chat_queue_wait_seconds.observe(waited)
+        self.admitted += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.active += 1
+        service_started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            self._avg_service_seconds = 0.9 * self._avg_service_seconds + 0.1 * (time.monotonic() - service_started)
+
+    def stats(self) -> Dict:
+        return {
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_seconds": self.total_wait_seconds / self.admitted if self.admitted else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+            "avg_service_seconds": self._avg_service_seconds
+        }
+
+
+class SessionLocks:
+    def __init__(self, max_pending: int = 2):
+        self.max_pending = max_pending
+        self._locks: Dict[str, list] = {}
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            self._locks[session_id] = entry
+        if entry[1] > self.max_pending:
+            self.rejected += 1
+            raise AdmissionRejected("Another message for this session is still being processed", 2, status_code=429)
+        
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._locks.get(session_id) is entry:
+                del self._locks[session_id]
+
+    def stats(self) -> Dict:
+        return {
+            "locked_sessions": len(self._locks),
+            "pending": sum(count for _, count in self._locks.values()),
+            "rejected": self.rejected
+        }
+
+
+admission = AdmissionController(
+    max_concurrent=int(os.getenv("CHAT_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("CHAT_MAX_QUEUE", "32")),
+    queue_timeout=float(os.getenv("CHAT_QUEUE_TIMEOUT", "15"))
+)
+session_locks = SessionLocks(max_pending=int(os.getenv("SESSION_MAX_PENDING", "2")))
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Response
+from backend.api.calendly_integration import get_calendly_service
+from backend.api.concurrency import admission, session_locks
+from backend.agent.scheduling_agent import agent_instance
+from backend.rag.embeddings import get_embeddings
+from backend.rag.faq_rag import faq_stats, semantic_cache
+from backend.utils.bedrock import bedrock_limiter
+from backend.utils.metrics import registry
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def cache_stats():
+    stats = {"faq_semantic": semantic_cache.stats(), "embeddings": get_embeddings().stats()}
+    try:
+        service = get_calendly_service()
+    except ValueError:
+        return stats
+    for name, values in service.cache_stats().items():
+        stats[f"calendly_{name}"] = values
+    return stats
+
+
+def cache_families():
+    stats = cache_stats()
+
+    def samples(field: str):
+        return [({"cache": name}, values[field]) for name, values in stats.items() if field in values]
+
+    return [
+        ("cache_hit_ratio", "Hit ratio of each in-process cache", "gauge", samples("hit_rate")),
+        ("cache_hits_total", "Hits of each in-process cache", "counter", samples("hits")),
+        ("cache_misses_total", "Misses of each in-process cache", "counter", samples("misses")),
+        ("cache_entries", "Entries held by each in-process cache", "gauge", samples("size"))
+    ]
+
+
+registry.collector(cache_families)
+registry.gauge("session_store_sessions", "Conversations held by the session store",
+               lambda: [({}, agent_instance.sessions.stats()["sessions"])])
+registry.gauge("session_store_bytes", "Approximate memory held by in-memory sessions",
+               lambda: [({}, agent_instance.sessions.stats().get("approx_bytes", 0))])
+registry.gauge("router_handled_fraction", "Fraction of turns answered without the agent",
+               lambda: [({}, agent_instance.router.stats()["handled_fraction"])])
+registry.counter_func("faq_answers_total", "FAQ answers by path",
+               lambda: [({"path": path}, count) for path, count in faq_stats.items()])
+registry.gauge("chat_active", "Chat turns currently running", lambda: [({}, admission.active)])
+registry.gauge("chat_queue_depth", "Chat turns waiting for an admission slot", lambda: [({}, admission.waiting)])
+registry.counter_func("chat_rejected_total", "Chat turns rejected by admission control", lambda: [
+    ({"reason": "capacity"}, admission.rejected),
+    ({"reason": "queue_timeout"}, admission.timed_out),
+    ({"reason": "session_busy"}, session_locks.rejected)
+])
+registry.gauge("bedrock_rate_limit", "Current Bedrock requests per second allowed by the limiter",
+               lambda: [({}, bedrock_limiter.rate)])
+registry.counter_func("bedrock_throttles_total", "Throttling responses seen from Bedrock",
+               lambda: [({}, bedrock_limiter.throttles)])
+
+
+@router.get("/metrics")
+async def metrics_endpoint():
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
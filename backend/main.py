@@ -1,15 +1,34 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from backend.api.chat import router as chat_router
+from backend.api.admin import router as admin_router
+from backend.api.metrics import router as metrics_router
+from backend.api.calendly_integration import open_http_client, close_http_client
+from backend.rag.faq_rag import get_rag_chain
+from backend.utils.metrics import http_request_seconds
 from dotenv import load_dotenv
 import os
+import time
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_http_client()
+    if os.getenv("FAQ_PRELOAD", "false").lower() == "true":
+        try:
+            await get_rag_chain()
+        except Exception as e:
+            print(f"FAQ chain preload failed, will retry on first use: {str(e)}")
+    yield
+    await close_http_client()
+
 app = FastAPI(
     title="Medical Appointment Scheduling Agent",
     description="AI-powered appointment scheduling with AWS Bedrock and LangChain",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -20,7 +39,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        route = request.scope.get("route")
+        http_request_seconds.observe(
+            time.perf_counter() - started,
+            route=getattr(route, "path", "unmatched"),
+            method=request.method,
+            status=status
+        )
+
 app.include_router(chat_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
 
 @app.get("/")
 async def root():
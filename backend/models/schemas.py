@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, Dict, Any
 
 class ChatRequest(BaseModel):
@@ -9,3 +9,7 @@ class ChatResponse(BaseModel):
     response: str
     booking_details: Optional[Dict[str, Any]] = None
     action_performed: Optional[str] = None
+    usage: Optional[Dict[str, int]] = None
+
+class TraceSettings(BaseModel):
+    sample_rate: float = Field(ge=0.0, le=1.0)
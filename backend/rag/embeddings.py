@@ -1,8 +1,178 @@
-from langchain_aws import BedrockEmbeddings
+from langchain_core.embeddings import Embeddings
+from backend.utils.cache import TTLCache
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional
+import hashlib
 import os
+import sqlite3
+import threading
 
+
+class EmbeddingDiskCache:
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        if not keys:
+            return {}
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+        return found
+
+    def set_many(self, items: Dict[str, List[float]]):
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items.items()]
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, underlying: Embeddings, namespace: str, max_size: int = 2048, disk_cache: Optional[EmbeddingDiskCache] = None):
+        self.underlying = underlying
+        self.namespace = namespace
+        self.memory = TTLCache(ttl=float("inf"), max_size=max_size)
+        self.disk = disk_cache
+        self.disk_hits = 0
+
+    def _key(self, kind: str, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{kind}:{digest}"
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        pending = []
+        for key in dict.fromkeys(keys):
+            vector = self.memory.get(key)
+            if vector is None:
+                pending.append(key)
+            else:
+                found[key] = vector
+        if pending and self.disk is not None:
+            from_disk = self.disk.get_many(pending)
+            self.disk_hits += len(from_disk)
+            for key, vector in from_disk.items():
+                self.memory.set(key, vector)
+            found.update(from_disk)
+        return found
+
+    def _store(self, items: Dict[str, List[float]]):
+        for key, vector in items.items():
+            self.memory.set(key, vector)
+        if self.disk is not None:
+            self.disk.set_many(items)
+
+    def _misses(self, texts: List[str], keys: List[str], found: Dict[str, List[float]]) -> Dict[str, str]:
+        return {key: text for key, text in zip(keys, texts) if key not in found}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key("doc", text) for text in texts]
+        found = self._lookup(keys)
+        misses = self._misses(texts, keys, found)
+        if misses:
+            vectors = self.underlying.embed_documents(list(misses.values()))
+            computed = dict(zip(misses.keys(), vectors))
+            self._store(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key("query", text)
+        found = self._lookup([key])
+        if key in found:
+            return found[key]
+        vector = self.underlying.embed_query(text)
+        self._store({key: vector})
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key("doc", text) for text in texts]
+        found = self._lookup(keys)
+        misses = self._misses(texts, keys, found)
+        if misses:
+            vectors = await self.underlying.aembed_documents(list(misses.values()))
+            computed = dict(zip(misses.keys(), vectors))
+            self._store(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key("query", text)
+        found = self._lookup([key])
+        if key in found:
+            return found[key]
+        vector = await self.underlying.aembed_query(text)
+        self._store({key: vector})
+        return vector
+
+    def stats(self) -> Dict:
+        stats = self.memory.stats()
+        stats["disk_hits"] = self.disk_hits
+        return stats
+
+
+def create_base_embeddings():
+    provider = os.getenv("EMBEDDING_PROVIDER", "bedrock").lower()
+    batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    
+    if provider == "hashing":
+        from backend.rag.local_embeddings import HashingEmbeddings
+        embeddings = HashingEmbeddings(
+            dimensions=int(os.getenv("HASHING_EMBEDDING_DIMENSIONS", "512")),
+            batch_size=batch_size
+        )
+        return embeddings, embeddings.model_id
+    
+    if provider == "sentence-transformers":
+        from backend.rag.local_embeddings import get_sentence_transformer_embeddings
+        model_name = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        return get_sentence_transformer_embeddings(model_name, batch_size=batch_size), model_name
+    
+    if provider != "bedrock":
+        raise ValueError(f"Unknown EMBEDDING_PROVIDER: {provider}")
+    
+    from backend.utils.bedrock import RateLimitedBedrockEmbeddings, get_bedrock_client
+    model_id = "amazon.titan-embed-text-v1"
+    embeddings = RateLimitedBedrockEmbeddings(
+        client=get_bedrock_client(),
+        model_id=model_id,
+        normalize=True
+    )
+    return embeddings, f"{model_id}:normalized"
+
+
+@lru_cache(maxsize=1)
 def get_embeddings():
-    return BedrockEmbeddings(
-        model_id="amazon.titan-embed-text-v1",
-        region_name=os.getenv("AWS_REGION", "us-east-1")
+    embeddings, model_id = create_base_embeddings()
+    cache_path = os.getenv("EMBEDDING_CACHE_PATH", "")
+    return CachedEmbeddings(
+        embeddings,
+        namespace=model_id,
+        max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "2048")),
+        disk_cache=EmbeddingDiskCache(cache_path) if cache_path else None
     )
@@ -1,22 +1,36 @@
-from langchain_aws import ChatBedrock
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.output_parser import StrOutputParser
-from langchain.schema.runnable import RunnablePassthrough
-from backend.rag.vector_store import get_vector_store
+from backend.rag.vector_store import get_vector_store, reset_vector_store, reindex_vector_store, get_index_version
+from backend.rag.embeddings import get_embeddings
+from backend.rag.semantic_cache import SemanticCache
+from backend.utils.bedrock import RateLimitedChatBedrock, get_bedrock_client, bedrock_priority
+from backend.utils.metrics import faq_stage_seconds
+from typing import Dict, Optional
+import asyncio
 import os
 
+_rag_chain = None
+_chain_lock = asyncio.Lock()
+
+faq_stats = {"direct": 0, "llm": 0, "semantic_cache": 0}
+
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv("FAQ_SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    max_size=int(os.getenv("FAQ_SEMANTIC_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("FAQ_SEMANTIC_CACHE_TTL", "3600"))
+)
+
 def format_docs(docs):
     return "\n\n".join([doc.page_content for doc in docs])
 
-def create_rag_chain():
-    llm = ChatBedrock(
+def create_rag_chain(llm=None):
+    llm = llm or RateLimitedChatBedrock(
+        client=get_bedrock_client(),
         model_id="anthropic.claude-3-5-sonnet-20240620-v1:0",
-        region_name=os.getenv("AWS_REGION", "us-east-1"),
         model_kwargs={"temperature": 0.7, "max_tokens": 2000}
     )
     
-    vector_store = get_vector_store()
-    retriever = vector_store.as_retriever(search_kwargs={"k": 3})
+    get_vector_store()
     
     template = """You are a helpful medical clinic assistant. Use the following context to answer the question.
 If you cannot find the answer in the context, say so politely.
@@ -30,16 +44,80 @@ Answer:"""
     
     prompt = ChatPromptTemplate.from_template(template)
     
-    rag_chain = (
-        {"context": retriever | format_docs, "question": RunnablePassthrough()}
-        | prompt
-        | llm
-        | StrOutputParser()
-    )
+    rag_chain = prompt | llm | StrOutputParser()
     
     return rag_chain
 
-async def search_faq(question: str) -> str:
-    rag_chain = create_rag_chain()
-    result = await rag_chain.ainvoke(question)
-    return result
+async def get_rag_chain():
+    global _rag_chain
+    if _rag_chain is None:
+        async with _chain_lock:
+            if _rag_chain is None:
+                _rag_chain = await asyncio.to_thread(create_rag_chain)
+    return _rag_chain
+
+async def reload_rag_chain(llm=None):
+    global _rag_chain
+    async with _chain_lock:
+        reset_vector_store()
+        _rag_chain = await asyncio.to_thread(create_rag_chain, llm)
+    return _rag_chain
+
+async def reload_knowledge_base() -> Dict[str, int]:
+    async with _chain_lock:
+        summary = await asyncio.to_thread(reindex_vector_store)
+        semantic_cache.clear()
+    return summary
+
+def direct_answer(doc) -> Optional[str]:
+    metadata = doc.metadata or {}
+    if metadata.get("source") == "clinic_faq":
+        answer = metadata.get("answer")
+        if not answer and "\nA: " in doc.page_content:
+            answer = doc.page_content.split("\nA: ", 1)[1]
+        return answer.strip() if answer else None
+    if metadata.get("source") == "clinic_info":
+        category = metadata.get("category", "")
+        value = doc.page_content[len(category) + 2:] if doc.page_content.startswith(f"{category}: ") else doc.page_content
+        label = category.replace("_", " ").capitalize()
+        return f"{label}: {value.strip()}" if label else value.strip()
+    return None
+
+async def search_faq(question: str) -> Dict:
+    with bedrock_priority("faq"):
+        return await _search_faq(question)
+
+async def _search_faq(question: str) -> Dict:
+    # Read once, before the chain and store are fetched: an answer built from
+    # them must not be cached under a version bumped by a reindex meanwhile.
+    version = get_index_version()
+    rag_chain = await get_rag_chain()
+    vector_store = get_vector_store()
+    threshold = float(os.getenv("FAQ_DIRECT_ANSWER_THRESHOLD", "0.85"))
+    cache_key = " ".join(question.lower().split())
+    
+    with faq_stage_seconds.time(stage="embed"):
+        query_vector = await get_embeddings().aembed_query(question)
+    with faq_stage_seconds.time(stage="semantic_cache"):
+        cached = semantic_cache.lookup(cache_key, query_vector, version=version)
+    if cached is not None:
+        answer, similarity = cached
+        faq_stats["semantic_cache"] += 1
+        return {"answer": answer, "path": "semantic_cache", "score": similarity}
+    
+    with faq_stage_seconds.time(stage="retrieve"):
+        results = await vector_store.asimilarity_search_with_relevance_scores(question, k=3)
+    docs = [doc for doc, _ in results]
+    top_score = results[0][1] if results else 0.0
+    
+    if results and top_score >= threshold:
+        answer = direct_answer(results[0][0])
+        if answer:
+            faq_stats["direct"] += 1
+            return {"answer": answer, "path": "direct", "score": top_score}
+    
+    with faq_stage_seconds.time(stage="generate"):
+        answer = await rag_chain.ainvoke({"context": format_docs(docs), "question": question})
+    semantic_cache.store(cache_key, query_vector, answer, version=version)
+    faq_stats["llm"] += 1
+    return {"answer": answer, "path": "llm", "score": top_score}
@@ -0,0 +1,77 @@
+from langchain.schema import Document
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+
+CLINIC_INFO_PATH = os.path.join(os.path.dirname(__file__), "../../data/clinic_info.json")
+
+
+def _short_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def load_clinic_documents(path: str = CLINIC_INFO_PATH) -> Optional[List[Document]]:
+    if not os.path.exists(path):
+        return None
+    
+    with open(path, 'r') as f:
+        clinic_data = json.load(f)
+    
+    documents = []
+    for item in clinic_data.get("faqs", []):
+        doc = Document(
+            page_content=f"Q: {item['question']}\nA: {item['answer']}",
+            metadata={
+                "source": "clinic_faq",
+                "doc_id": f"faq:{_short_hash(item['question'].strip().lower())}",
+                "question": item['question'],
+                "answer": item['answer']
+            }
+        )
+        documents.append(doc)
+    
+    for key, value in clinic_data.get("info", {}).items():
+        doc = Document(
+            page_content=f"{key}: {value}",
+            metadata={"source": "clinic_info", "doc_id": f"info:{key}", "category": key}
+        )
+        documents.append(doc)
+    
+    return documents
+
+
+def content_hash(doc: Document, embedding_model: str = "") -> str:
+    metadata = {k: v for k, v in doc.metadata.items() if k != "content_hash"}
+    return _short_hash(json.dumps([embedding_model, doc.page_content, metadata], sort_keys=True))
+
+
+def sync_documents(store, documents: List[Document], embedding_model: str = "") -> Dict[str, int]:
+    existing = store.get(include=["metadatas"])
+    existing_hashes = {
+        doc_id: (metadata or {}).get("content_hash")
+        for doc_id, metadata in zip(existing["ids"], existing["metadatas"])
+    }
+    
+    wanted = {}
+    for doc in documents:
+        doc.metadata["content_hash"] = content_hash(doc, embedding_model)
+        wanted[doc.metadata["doc_id"]] = doc
+    
+    to_delete = [doc_id for doc_id in existing_hashes if doc_id not in wanted]
+    changed = [doc_id for doc_id, doc in wanted.items()
+               if doc_id in existing_hashes and existing_hashes[doc_id] != doc.metadata["content_hash"]]
+    added = [doc_id for doc_id in wanted if doc_id not in existing_hashes]
+    
+    if to_delete or changed:
+        store.delete(ids=to_delete + changed)
+    upserts = changed + added
+    if upserts:
+        store.add_documents([wanted[doc_id] for doc_id in upserts], ids=upserts)
+    
+    return {
+        "added": len(added),
+        "updated": len(changed),
+        "deleted": len(to_delete),
+        "unchanged": len(wanted) - len(upserts)
+    }
@@ -0,0 +1,165 @@
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import os
+import threading
+import uuid
+import numpy as np
+
+MATRIX_FILE = "embeddings.npy"
+DOCUMENTS_FILE = "documents.json"
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+class NumpyVectorStore(VectorStore):
+    def __init__(self, embedding: Embeddings, persist_directory: Optional[str] = None, mmap: bool = True):
+        self._embedding = embedding
+        self.persist_directory = persist_directory
+        self._lock = threading.Lock()
+        # (matrix, ids, documents) replaced as a whole so readers never see
+        # rows of one version paired with documents of another.
+        self._snapshot: Tuple[np.ndarray, List[str], List[Document]] = (np.zeros((0, 0), dtype=np.float32), [], [])
+        if persist_directory and self.exists(persist_directory):
+            self._load(mmap)
+
+    @staticmethod
+    def exists(persist_directory: str) -> bool:
+        return os.path.exists(os.path.join(persist_directory, MATRIX_FILE)) and os.path.exists(os.path.join(persist_directory, DOCUMENTS_FILE))
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._snapshot[1])
+
+    def _load(self, mmap: bool):
+        with open(os.path.join(self.persist_directory, DOCUMENTS_FILE), "r") as f:
+            data = json.load(f)
+        documents = [Document(page_content=item["page_content"], metadata=item["metadata"]) for item in data["documents"]]
+        matrix = np.load(os.path.join(self.persist_directory, MATRIX_FILE), mmap_mode="r" if mmap else None)
+        self._snapshot = (matrix, data["ids"], documents)
+
+    def _persist(self):
+        if not self.persist_directory:
+            return
+        os.makedirs(self.persist_directory, exist_ok=True)
+        matrix_path = os.path.join(self.persist_directory, MATRIX_FILE)
+        documents_path = os.path.join(self.persist_directory, DOCUMENTS_FILE)
+        matrix, ids, documents = self._snapshot
+        with open(matrix_path + ".tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+        with open(documents_path + ".tmp", "w") as f:
+            json.dump({
+                "ids": ids,
+                "documents": [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in documents]
+            }, f)
+        os.replace(matrix_path + ".tmp", matrix_path)
+        os.replace(documents_path + ".tmp", documents_path)
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        vectors = _normalize_rows(self._embedding.embed_documents(texts))
+        replaced = set(ids)
+        with self._lock:
+            old_matrix, old_ids, old_documents = self._snapshot
+            keep = [i for i, existing in enumerate(old_ids) if existing not in replaced]
+            matrix = np.asarray(old_matrix)[keep] if len(old_ids) else np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            self._snapshot = (
+                np.ascontiguousarray(np.vstack([matrix, vectors]), dtype=np.float32),
+                [old_ids[i] for i in keep] + ids,
+                [old_documents[i] for i in keep] + [
+                    Document(page_content=text, metadata=metadata or {}) for text, metadata in zip(texts, metadatas)
+                ]
+            )
+            self._persist()
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        removed = set(ids)
+        with self._lock:
+            old_matrix, old_ids, old_documents = self._snapshot
+            keep = [i for i, existing in enumerate(old_ids) if existing not in removed]
+            if len(keep) == len(old_ids):
+                return False
+            self._snapshot = (
+                np.ascontiguousarray(np.asarray(old_matrix)[keep], dtype=np.float32),
+                [old_ids[i] for i in keep],
+                [old_documents[i] for i in keep]
+            )
+            self._persist()
+        return True
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> Dict[str, List]:
+        _, stored_ids, documents = self._snapshot
+        wanted = None if ids is None else set(ids)
+        positions = [i for i, existing in enumerate(stored_ids) if wanted is None or existing in wanted]
+        return {
+            "ids": [stored_ids[i] for i in positions],
+            "metadatas": [documents[i].metadata for i in positions],
+            "documents": [documents[i].page_content for i in positions]
+        }
+
+    def batch_search_by_vector(self, vectors: Sequence[Sequence[float]], k: int = 4) -> List[List[Tuple[int, float]]]:
+        return self._search(self._snapshot[0], vectors, k)
+
+    @staticmethod
+    def _search(matrix: np.ndarray, vectors: Sequence[Sequence[float]], k: int) -> List[List[Tuple[int, float]]]:
+        if len(matrix) == 0:
+            return [[] for _ in vectors]
+        queries = _normalize_rows(vectors)
+        scores = queries @ matrix.T
+        k = min(k, scores.shape[1])
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        return [list(zip(row.tolist(), row_scores.tolist())) for row, row_scores in zip(top, top_scores)]
+
+    def batch_similarity_search(self, queries: List[str], k: int = 4) -> List[List[Tuple[Document, float]]]:
+        vectors = self._embedding.embed_documents(queries) if len(queries) > 1 else [self._embedding.embed_query(queries[0])]
+        matrix, _, documents = self._snapshot
+        return [[(documents[i], score) for i, score in hits] for hits in self._search(matrix, vectors, k)]
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        matrix, _, documents = self._snapshot
+        return [(documents[i], score) for i, score in self._search(matrix, [embedding], k)[0]]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return lambda score: score
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None, persist_directory: Optional[str] = None, **kwargs: Any) -> "NumpyVectorStore":
+        store = cls(embedding, persist_directory=None)
+        store.persist_directory = persist_directory
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
+import time
+import numpy as np
+
+
+class SemanticCache:
+    def __init__(self, threshold: float = 0.92, max_size: int = 512, ttl: float = 3600, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, Any, float]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: List[str] = []
+        self._lock = threading.Lock()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _evict_expired(self):
+        now = self._clock()
+        expired = [key for key, (_, _, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self.evictions += len(expired)
+            self._matrix = None
+
+    def _ensure_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self.evictions += len(self._entries)
+                self._entries.clear()
+                self._matrix = None
+            self.version = version
+
+    def lookup(self, key: str, vector, version=None) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            self._ensure_version(version)
+            self._evict_expired()
+            if not self._entries:
+                self.misses += 1
+                return None
+            if self._matrix is None:
+                self._keys = list(self._entries.keys())
+                self._matrix = np.stack([self._entries[k][0] for k in self._keys])
+            scores = self._matrix @ self._normalize(vector)
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score < self.threshold:
+                self.misses += 1
+                return None
+            matched_key = self._keys[best]
+            self._entries.move_to_end(matched_key)
+            self.hits += 1
+            return self._entries[matched_key][1], score
+
+    def store(self, key: str, vector, value: Any, version=None):
+        with self._lock:
+            if version is not None and self.version is not None and version < self.version:
+                return
+            self._ensure_version(version)
+            self._entries[key] = (self._normalize(vector), value, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._matrix = None
+
+    def clear(self):
+        with self._lock:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
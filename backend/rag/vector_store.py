@@ -1,56 +1,100 @@
 from langchain_community.vectorstores import Chroma
-from langchain.schema import Document
 from backend.rag.embeddings import get_embeddings
+from backend.rag.indexer import load_clinic_documents, sync_documents
+from backend.rag.numpy_store import NumpyVectorStore
+from typing import Dict
 import os
-import json
+import threading
 
-def initialize_vector_store():
-    persist_directory = os.getenv("CHROMA_PERSIST_DIRECTORY", "./data/vectordb")
+_vector_store = None
+_vector_store_lock = threading.Lock()
+_index_version = 0
+
+def get_index_version() -> int:
+    return _index_version
+
+def get_backend() -> str:
+    return os.getenv("VECTOR_STORE_BACKEND", "chroma").lower()
+
+def get_persist_directory() -> str:
+    if get_backend() == "numpy":
+        return os.getenv("NUMPY_INDEX_DIRECTORY", "./data/numpy_index")
+    return os.getenv("CHROMA_PERSIST_DIRECTORY", "./data/vectordb")
+
+def create_vector_store():
+    persist_directory = get_persist_directory()
+    embeddings = get_embeddings()
     
-    clinic_info_path = os.path.join(os.path.dirname(__file__), "../../data/clinic_info.json")
+    if get_backend() == "numpy":
+        return NumpyVectorStore(embeddings, persist_directory=persist_directory)
     
-    if os.path.exists(clinic_info_path):
-        with open(clinic_info_path, 'r') as f:
-            clinic_data = json.load(f)
-        
-        documents = []
-        for item in clinic_data.get("faqs", []):
-            doc = Document(
-                page_content=f"Q: {item['question']}\nA: {item['answer']}",
-                metadata={"source": "clinic_faq", "question": item['question']}
-            )
-            documents.append(doc)
-        
-        for key, value in clinic_data.get("info", {}).items():
-            doc = Document(
-                page_content=f"{key}: {value}",
-                metadata={"source": "clinic_info", "category": key}
-            )
-            documents.append(doc)
-        
-        embeddings = get_embeddings()
-        vector_store = Chroma.from_documents(
-            documents=documents,
-            embedding=embeddings,
-            persist_directory=persist_directory
-        )
-        return vector_store
-    else:
-        embeddings = get_embeddings()
-        return Chroma(
+    # Cosine space makes Chroma's relevance score the cosine similarity,
+    # the same scale NumpyVectorStore reports. The space is fixed when a
+    # collection is created, and get_or_create overwrites the metadata of an
+    # existing one, so our own marker records how the collection was built.
+    vector_store = Chroma(persist_directory=persist_directory, embedding_function=embeddings)
+    if (vector_store._collection.metadata or {}).get("score_space") != "cosine":
+        if vector_store._collection.count():
+            print(f"Chroma collection in {persist_directory} was not built with cosine distance; recreating it")
+        vector_store.delete_collection()
+        vector_store = Chroma(
             persist_directory=persist_directory,
-            embedding_function=embeddings
+            embedding_function=embeddings,
+            collection_metadata={"hnsw:space": "cosine", "score_space": "cosine"}
         )
+    return vector_store
 
-def get_vector_store():
-    persist_directory = os.getenv("CHROMA_PERSIST_DIRECTORY", "./data/vectordb")
-    embeddings = get_embeddings()
+def sync_vector_store(vector_store) -> Dict[str, int]:
+    global _index_version
+    documents = load_clinic_documents()
+    if documents is None:
+        return {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
     
-    if not os.path.exists(persist_directory) or not os.listdir(persist_directory):
+    embedding_model = getattr(get_embeddings(), "namespace", "")
+    summary = sync_documents(vector_store, documents, embedding_model=embedding_model)
+    if summary["added"] or summary["updated"] or summary["deleted"]:
+        _index_version += 1
+    return summary
+
+def initialize_vector_store():
+    vector_store = create_vector_store()
+    summary = sync_vector_store(vector_store)
+    print(f"Vector store synced: {summary}")
+    return vector_store
+
+def open_vector_store():
+    persist_directory = get_persist_directory()
+    
+    if get_backend() == "numpy":
+        exists = NumpyVectorStore.exists(persist_directory)
+    else:
+        exists = os.path.exists(persist_directory) and bool(os.listdir(persist_directory))
+    
+    if not exists:
         print("Vector store not found. Initializing...")
         return initialize_vector_store()
     
-    return Chroma(
-        persist_directory=persist_directory,
-        embedding_function=embeddings
-    )
+    vector_store = create_vector_store()
+    if get_backend() != "numpy" and vector_store._collection.count() == 0:
+        summary = sync_vector_store(vector_store)
+        print(f"Vector store synced: {summary}")
+    return vector_store
+
+def get_vector_store():
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                _vector_store = open_vector_store()
+    return _vector_store
+
+def reindex_vector_store() -> Dict[str, int]:
+    vector_store = get_vector_store()
+    with _vector_store_lock:
+        return sync_vector_store(vector_store)
+
+def reset_vector_store():
+    global _vector_store, _index_version
+    with _vector_store_lock:
+        _vector_store = None
+        _index_version += 1
@@ -1,24 +1,48 @@
 from langchain.tools import tool
-from backend.api.calendly_integration import CalendlyService
+from backend.api.calendly_integration import get_calendly_service
+from backend.tools.results import record_result
+from backend.utils.slot_index import parse_preferred_time
 from datetime import datetime, timedelta
 from collections import defaultdict
+from typing import Dict, List
 from zoneinfo import ZoneInfo
 import os
-import json
+
+
+APPOINTMENT_DURATIONS = {
+    "general consultation": "30min",
+    "follow-up": "15min",
+    "physical exam": "45min",
+    "specialist consultation": "60min"
+}
+
+MAX_DAYS = 28
+MAX_DATES_SHOWN = 5
+MAX_SLOTS_PER_DATE = 5
+
+
+def resolve_event_type(event_types: List[Dict], appointment_type: str) -> Dict:
+    target_duration = APPOINTMENT_DURATIONS.get(appointment_type.strip().lower().replace("follow up", "follow-up"))
+    for event_type in event_types:
+        if target_duration and target_duration in event_type.get("name", "").lower():
+            return event_type
+    return event_types[0]
 
 
 @tool
-async def get_availability_tool(date_preference: str, appointment_type: str, time_preference: str = "any") -> str:
+async def get_availability_tool(date_preference: str, appointment_type: str, time_preference: str = "any", days: int = 7, preferred_time: str = "") -> str:
     """
     Fetch available appointment slots from Calendly.
     
     Args:
-        date_preference: Preferred date in YYYY-MM-DD format
-        appointment_type: Type of appointment (General Consultation, Follow-up, Physical Exam, Specialist Consultation)
+        date_preference: First date to search, in YYYY-MM-DD format
+        appointment_type: Type of appointment (General Consultation, Follow-up, Physical Exam, Specialist Consultation). Several types can be given comma-separated, e.g. "General Consultation, Physical Exam"
         time_preference: Time preference - "morning" (before 12 PM), "afternoon" (12 PM - 5 PM), "evening" (after 5 PM), or "any"
+        days: Number of days to search from date_preference (1-28), e.g. 14 for "the next two weeks"
+        preferred_time: Optional time the patient asked for, e.g. "3:30 PM" or "2024-05-06 10:00 AM". Only the slots closest to it are listed
     
     Returns:
-        Formatted string of available time slots
+        Available time slots grouped by date. Use a date and time from this list as slot_time when booking.
     """
     try:
         timezone = os.getenv("TIMEZONE", "Asia/Kolkata")
@@ -29,80 +53,63 @@ async def get_availability_tool(date_preference: str, appointment_type: str, tim
         if requested_date < today:
             return f"Cannot fetch availability for past dates. Requested: {date_preference}, Today: {today}. Please provide a future date."
         
-        service = CalendlyService()
+        days = max(1, min(int(days or 7), MAX_DAYS))
+        requested_types = [name.strip() for name in appointment_type.split(",") if name.strip()] or [appointment_type]
+        
+        service = get_calendly_service()
         event_types = await service.get_event_types()
         
         if not event_types:
             return "No event types available. Please contact support."
         
-        appointment_mapping = {
-            "general consultation": "30min",
-            "follow-up": "15min",
-            "physical exam": "45min",
-            "specialist consultation": "60min"
-        }
-        
-        target_duration = appointment_mapping.get(appointment_type.lower())
-        event_type_uri = None
-        
-        for event_type in event_types:
-            if target_duration and target_duration in event_type.get("name", "").lower():
-                event_type_uri = event_type["uri"]
-                break
+        type_by_uri = {}
+        for name in requested_types:
+            type_by_uri.setdefault(resolve_event_type(event_types, name)["uri"], name)
         
-        if not event_type_uri:
-            event_type_uri = event_types[0]["uri"]
+        start_time = datetime.combine(requested_date, datetime.min.time()).isoformat()
+        end_time = datetime.combine(requested_date + timedelta(days=days), datetime.min.time()).isoformat()
         
-        start_date = datetime.fromisoformat(date_preference).date()
-        start_time = datetime.combine(start_date, datetime.min.time()).isoformat()
-        end_time = datetime.combine(start_date + timedelta(days=7), datetime.min.time()).isoformat()
+        index = await service.get_slot_index(list(type_by_uri), start_time, end_time, timezone)
+        label = ", ".join(type_by_uri.values())
         
-        availability = await service.get_availability(event_type_uri, start_time, end_time)
+        if not len(index):
+            return f"No available slots found for {label} between {requested_date} and {requested_date + timedelta(days=days - 1)}. Please try a different date or call (555) 123-4567 for last-minute cancellations."
         
-        if not availability:
-            return f"No available slots found for {appointment_type} around {date_preference}. Please try a different date or call (555) 123-4567 for last-minute cancellations."
+        rows = index.query(time_preference=time_preference)
+        minute_of_day, preferred_epoch = parse_preferred_time(preferred_time, tz)
+        if minute_of_day is not None:
+            rows = index.nearest(rows, minute_of_day, preferred_epoch, n=MAX_DATES_SHOWN * MAX_SLOTS_PER_DATE)
+        rows = index.limit_per_day(rows, MAX_DATES_SHOWN, MAX_SLOTS_PER_DATE)
         
-        slots_by_date = defaultdict(list)
+        show_type = len(type_by_uri) > 1
+        slots_by_date = defaultdict(dict)
         slot_data = []
         
-        for slot in availability:
-            if not isinstance(slot, dict):
-                continue
-                
-            slot_time_utc = datetime.fromisoformat(slot["start_time"].replace("Z", "+00:00"))
-            slot_time = slot_time_utc.astimezone(tz)
-            hour = slot_time.hour
-            
-            if time_preference == "morning" and hour >= 12:
-                continue
-            elif time_preference == "afternoon" and (hour < 12 or hour >= 17):
-                continue
-            elif time_preference == "evening" and hour < 17:
-                continue
-            
-            start_time_iso = slot["start_time"]
-            
-            date_key = slot_time.strftime('%A, %B %d')
-            time_str = slot_time.strftime('%I:%M %p')
-            slots_by_date[date_key].append({"time": time_str})
+        for row in rows:
+            slot = index.slot(row)
+            slot_time = slot["local_time"]
+            date_key = f"{slot_time.strftime('%A, %B %d')} ({slot_time.strftime('%Y-%m-%d')})"
+            slots_by_date[date_key].setdefault(slot_time.strftime('%I:%M %p'), []).append(type_by_uri[slot["event_type_uri"]])
             slot_data.append({
                 "time": slot_time.strftime('%Y-%m-%d %I:%M %p'),
-                "start_time": start_time_iso,
-                "event_type_uri": event_type_uri
+                "start_time": slot["start_time"],
+                "event_type_uri": slot["event_type_uri"],
+                "appointment_type": type_by_uri[slot["event_type_uri"]]
             })
         
         if not slots_by_date:
-            return f"No {time_preference} slots available for {appointment_type}. Available times are outside your preferred time range. Would you like to see all available times?"
+            return f"No {time_preference} slots available for {label}. Available times are outside your preferred time range. Would you like to see all available times?"
         
-        result = f"Available {time_preference} slots for {appointment_type}:\n\n"
-        for date, times in list(slots_by_date.items())[:5]:
-            result += f"{date}:\n"
-            for slot_info in times[:5]:
-                result += f"  - {slot_info['time']}\n"
+        result = f"Available {time_preference} slots for {label}:\n"
+        for date, times in slots_by_date.items():
+            shown = [f"{time} ({', '.join(types)})" if show_type else time for time, types in times.items()]
+            result += f"{date}: {', '.join(shown)}\n"
         
-        if slot_data:
-            result += f"\n\nSLOT_DATA:{json.dumps(slot_data[:10])}"
-        return result.strip()
+        return record_result("availability", result.strip(), {
+            "appointment_type": label,
+            "time_preference": time_preference,
+            "slots": slot_data
+        })
     
     except ValueError as e:
         return f"Invalid date format. Please use YYYY-MM-DD format. Error: {str(e)}"
@@ -1,21 +1,56 @@
 from langchain.tools import tool
-from backend.api.calendly_integration import CalendlyService
+from backend.api.calendly_integration import get_calendly_service
+from backend.tools.results import current_booking_data, record_result
 from datetime import datetime
-import json
-from zoneinfo import ZoneInfo
+from typing import Dict, Optional
 import os
+import re
+
+EMAIL_PATTERN = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+
+
+def _parse_slot_time(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(" ".join(value.split()).upper(), "%Y-%m-%d %I:%M %p")
+    except ValueError:
+        return None
+
+
+def validate_patient(patient_name: str, patient_email: str) -> Optional[str]:
+    if not patient_name or not patient_name.strip():
+        return "Error: Patient name is required."
+    if not EMAIL_PATTERN.match((patient_email or "").strip()):
+        return f"Error: '{patient_email}' is not a valid email address. Please ask the patient to confirm their email."
+    return None
+
+
+def find_offered_slot(slot_time: str, appointment_type: str = "") -> Optional[Dict]:
+    requested = _parse_slot_time(slot_time)
+    if requested is None:
+        return None
+    wanted = appointment_type.strip().lower()
+    matches = [
+        slot for slot in current_booking_data().get("offered_slots", [])
+        if _parse_slot_time(slot.get("time", "")) == requested
+    ]
+    for slot in matches:
+        if not wanted or slot.get("appointment_type", "").lower() == wanted:
+            return slot
+    return matches[0] if matches else None
+
 
 @tool
-async def book_appointment_tool(slot_time: str, patient_name: str, patient_email: str, event_type_uri: str, start_time_iso: str, patient_notes: str = "") -> str:
+async def book_appointment_tool(slot_time: str, patient_name: str, patient_email: str, appointment_type: str = "", event_type_uri: str = "", start_time_iso: str = "", patient_notes: str = "") -> str:
     """
     Book an appointment at the specified time slot.
     
     Args:
-        slot_time: Appointment time from availability results (e.g., "2025-11-03 12:30 PM")
+        slot_time: Appointment date and time from availability results, as "YYYY-MM-DD HH:MM AM/PM" (e.g., "2025-11-03 12:30 PM")
         patient_name: Full name of the patient
         patient_email: Email address of the patient
-        event_type_uri: Event type URI from availability results
-        start_time_iso: ISO format start time from availability results
+        appointment_type: Optional; the appointment type to book when the slot was offered for several types
+        event_type_uri: Optional; resolved from the availability results when omitted
+        start_time_iso: Optional; resolved from the availability results when omitted
         patient_notes: Optional notes or reason for visit
     
     Returns:
@@ -24,16 +59,26 @@ async def book_appointment_tool(slot_time: str, patient_name: str, patient_email
     try:
         timezone = os.getenv("TIMEZONE", "Asia/Kolkata")
         
+        invalid = validate_patient(patient_name, patient_email)
+        if invalid:
+            return invalid
+        
+        if not event_type_uri or not start_time_iso:
+            slot = find_offered_slot(slot_time, appointment_type)
+            if slot:
+                event_type_uri = event_type_uri or slot["event_type_uri"]
+                start_time_iso = start_time_iso or slot["start_time"]
+        
         if not event_type_uri or not start_time_iso:
-            return "Error: Event type URI and start time are required. Please use a slot from the available options."
+            return "Error: That time is not in the latest availability results. Please check availability again and use one of the listed slots."
         
-        service = CalendlyService()
+        service = get_calendly_service()
         
         booking = await service.create_booking(
             event_type_uri=event_type_uri,
             start_time=start_time_iso,
-            invitee_email=patient_email,
-            invitee_name=patient_name,
+            invitee_email=patient_email.strip(),
+            invitee_name=patient_name.strip(),
             invitee_notes=patient_notes,
             timezone=timezone
         )
@@ -47,6 +92,7 @@ async def book_appointment_tool(slot_time: str, patient_name: str, patient_email
         result = {
             "booking_uuid": invitee_uuid,
             "event_uri": event_uri,
+            "scheduled_event_uuid": event_uri.split("/")[-1],
             "patient_name": patient_name,
             "patient_email": patient_email,
             "slot_time": slot_time,
@@ -55,21 +101,12 @@ async def book_appointment_tool(slot_time: str, patient_name: str, patient_email
             "reschedule_url": reschedule_url
         }
         
-        return f"""Appointment booked successfully!
-
-Booking Details:
-- Patient: {patient_name}
-- Email: {patient_email}
-- Time: {slot_time}
-- Booking ID: {invitee_uuid}
-- Status: {status}
-
-Reschedule: {reschedule_url}
-Cancel: {cancel_url}
-
-You will receive a confirmation email at {patient_email}.
-
-BOOKING_DATA: {json.dumps(result)}"""
+        return record_result("booking", f"""Appointment booked successfully.
+Booking ID: {invitee_uuid}
+Scheduled event ID: {result['scheduled_event_uuid']}
+Time: {slot_time}
+Status: {status}
+A confirmation email with reschedule and cancel links will be sent to {patient_email}.""", result)
     
     except Exception as e:
         return f"Error booking appointment: {str(e)}"
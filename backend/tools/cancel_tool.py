@@ -1,5 +1,7 @@
 from langchain.tools import tool
-from backend.api.calendly_integration import CalendlyService
+from backend.api.calendly_integration import get_calendly_service
+from backend.tools.results import current_booking_data, record_result
+import httpx
 
 @tool
 async def cancel_appointment_tool(booking_uuid: str, scheduled_event_uuid: str, cancellation_reason: str = "") -> str:
@@ -14,30 +16,34 @@ async def cancel_appointment_tool(booking_uuid: str, scheduled_event_uuid: str,
     Returns:
         Cancellation confirmation message
     """
+    booking_data = current_booking_data()
+    booking_uuid = (booking_uuid or booking_data.get("booking_uuid", "")).strip()
+    scheduled_event_uuid = (scheduled_event_uuid or booking_data.get("scheduled_event_uuid", "")).strip()
+    
+    if not booking_uuid:
+        return "Error: Booking ID required for cancellation."
+    if not scheduled_event_uuid:
+        return "Error: Scheduled event UUID required for cancellation."
+    
     try:
-        service = CalendlyService()
+        service = get_calendly_service()
         
         try:
-            existing_event = await service.get_scheduled_event(booking_uuid)
-        except Exception as e:
-            return f"Error: Could not find booking with UUID {booking_uuid}. Please verify the booking ID."
-        
-        if not scheduled_event_uuid:
-            return "Error: Scheduled event UUID required for cancellation."
-        
-        cancel_success = await service.cancel_invitee(booking_uuid, scheduled_event_uuid)
+            await service.cancel_invitee(booking_uuid, scheduled_event_uuid, reason=cancellation_reason or "Cancelled by patient")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return f"Error: Could not find booking with UUID {booking_uuid}. Please verify the booking ID."
+            if e.response.status_code in (400, 403):
+                return f"Error: Appointment {booking_uuid} cannot be cancelled. It may already be cancelled or in the past."
+            raise
         
-        if cancel_success:
-            return f"""Appointment cancelled successfully.
-
+        return record_result("cancellation", f"""Appointment cancelled successfully.
 Booking ID: {booking_uuid}
-Reason: {cancellation_reason if cancellation_reason else "Not specified"}
-
-If you'd like to book a new appointment, I'm here to help!
-
-CANCELLED_BOOKING: {booking_uuid}"""
-        else:
-            return f"Error: Failed to cancel appointment {booking_uuid}."
+Reason: {cancellation_reason if cancellation_reason else "Not specified"}""", {
+            "booking_uuid": booking_uuid,
+            "scheduled_event_uuid": scheduled_event_uuid,
+            "reason": cancellation_reason
+        })
     
     except Exception as e:
         return f"Error cancelling appointment: {str(e)}"
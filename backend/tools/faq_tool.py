@@ -13,7 +13,7 @@ async def search_faq_tool(question: str) -> str:
         Answer from the clinic knowledge base
     """
     try:
-        answer = await search_faq(question)
-        return answer
+        result = await search_faq(question)
+        return result["answer"]
     except Exception as e:
         return f"I apologize, but I couldn't find information about that. Please contact the clinic directly for assistance."
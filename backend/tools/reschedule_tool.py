@@ -1,87 +1,118 @@
 from langchain.tools import tool
-from backend.api.calendly_integration import CalendlyService
-from datetime import datetime, timedelta
-import json
+from backend.api.calendly_integration import get_calendly_service
+from backend.tools.booking_tool import find_offered_slot, validate_patient
+from backend.tools.results import current_booking_data, record_result
+from backend.utils.aio import gather_or_cancel
+from datetime import datetime, timezone as dt_timezone
 from zoneinfo import ZoneInfo
+import httpx
+import os
 
 @tool
-async def reschedule_appointment_tool(current_booking_uuid: str, current_scheduled_event_uuid: str, new_slot_time: str, new_scheduled_event_uuid: str, patient_email: str, patient_name: str) -> str:
+async def reschedule_appointment_tool(current_booking_uuid: str, current_scheduled_event_uuid: str, new_slot_time: str, patient_email: str, patient_name: str) -> str:
     """
     Reschedule an existing appointment to a new time slot.
-    
+
     Args:
         current_booking_uuid: Invitee UUID of the existing booking
         current_scheduled_event_uuid: UUID of current scheduled event
-        new_slot_time: New appointment time
-        new_scheduled_event_uuid: UUID of new scheduled event slot
+        new_slot_time: New appointment date and time from availability results, as "YYYY-MM-DD HH:MM AM/PM"
         patient_email: Patient email (from memory)
         patient_name: Patient name (from memory)
-    
+
     Returns:
         Confirmation message with new booking details
     """
+    timezone = os.getenv("TIMEZONE", "Asia/Kolkata")
+    tz = ZoneInfo(timezone)
+    booking_data = current_booking_data()
+    current_booking_uuid = (current_booking_uuid or booking_data.get("booking_uuid", "")).strip()
+    current_scheduled_event_uuid = (current_scheduled_event_uuid or booking_data.get("scheduled_event_uuid", "")).strip()
+
+    if not current_booking_uuid or not current_scheduled_event_uuid:
+        return "Error: Both the booking ID and the scheduled event ID of the existing appointment are required."
+    invalid = validate_patient(patient_name, patient_email)
+    if invalid:
+        return invalid
+
+    slot = find_offered_slot(new_slot_time)
     try:
-        ist = ZoneInfo("Asia/Kolkata")
-        service = CalendlyService()
-        
-        try:
-            existing_event = await service.get_scheduled_event(current_booking_uuid)
-        except Exception as e:
-            return f"Error: Could not find booking with UUID {current_booking_uuid}. Please verify the booking ID."
-        
-        event_types = await service.get_event_types()
-        if not event_types:
-            return "Error: No event types available."
-        
-        event_type_uri = event_types[0]["uri"]
-        
+        if slot:
+            new_datetime = datetime.fromisoformat(slot["start_time"].replace("Z", "+00:00"))
+        elif "T" in new_slot_time:
+            new_datetime = datetime.fromisoformat(new_slot_time.replace("Z", "+00:00"))
+            if new_datetime.tzinfo is None:
+                new_datetime = new_datetime.replace(tzinfo=tz)
+        else:
+            new_datetime = datetime.strptime(" ".join(new_slot_time.split()).upper(), "%Y-%m-%d %I:%M %p").replace(tzinfo=tz)
+    except ValueError:
+        return f"Error: Invalid date format for new slot time: {new_slot_time}"
+
+    if new_datetime < datetime.now(tz):
+        return f"Error: Cannot reschedule to a past date. Requested: {new_slot_time}"
+
+    try:
+        service = get_calendly_service()
+
         try:
-            if "T" in new_slot_time:
-                new_datetime = datetime.fromisoformat(new_slot_time.replace("Z", "+00:00")).astimezone(ist)
+            if slot:
+                existing_event, event_type_details = await gather_or_cancel(
+                    service.get_scheduled_event(current_scheduled_event_uuid),
+                    service.get_event_type_details(slot["event_type_uri"])
+                )
             else:
-                new_datetime = datetime.strptime(new_slot_time, "%Y-%m-%d %I:%M %p").replace(tzinfo=ist)
-        except:
-            return f"Error: Invalid date format for new slot time: {new_slot_time}"
-        
-        if new_datetime < datetime.now(ist):
-            return f"Error: Cannot reschedule to a past date. Requested: {new_slot_time}"
-        
-        if not new_scheduled_event_uuid:
-            return "Error: New scheduled event UUID required. Please select from available slots."
-        
-        cancel_success = await service.cancel_invitee(current_booking_uuid, current_scheduled_event_uuid)
-        
-        if not cancel_success:
-            return "Error: Failed to cancel the existing appointment. Rescheduling aborted."
-        
+                existing_event = await service.get_scheduled_event(current_scheduled_event_uuid)
+                event_type_details = None
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return f"Error: Could not find the appointment with event ID {current_scheduled_event_uuid}. Please verify the booking details."
+            raise
+
+        if existing_event.get("status") == "canceled":
+            return "Error: That appointment has already been cancelled. Would you like to book a new one instead?"
+
+        event_type_uri = slot["event_type_uri"] if slot else existing_event.get("event_type")
+        if not event_type_uri:
+            return "Error: Could not determine the appointment type of the existing booking."
+        if event_type_details is None:
+            event_type_details = await service.get_event_type_details(event_type_uri)
+
+        # Book the new slot before cancelling so a failed booking never
+        # leaves the patient without an appointment.
         new_booking = await service.create_booking(
-            scheduled_event_uuid=new_scheduled_event_uuid,
-            invitee_email=patient_email,
-            invitee_name=patient_name,
-            invitee_notes="Rescheduled appointment"
+            event_type_uri=event_type_uri,
+            start_time=new_datetime.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            invitee_email=patient_email.strip(),
+            invitee_name=patient_name.strip(),
+            invitee_notes="Rescheduled appointment",
+            timezone=timezone,
+            event_type_details=event_type_details
         )
-        
+
         new_invitee_uuid = new_booking.get("invitee_uuid", "")
-        
+        new_event_uri = new_booking.get("event_uri", "")
+        slot_label = new_datetime.astimezone(tz).strftime("%Y-%m-%d %I:%M %p")
+
         result = {
             "booking_uuid": new_invitee_uuid,
-            "scheduled_event_uuid": new_scheduled_event_uuid,
+            "event_uri": new_event_uri,
+            "scheduled_event_uuid": new_event_uri.split("/")[-1],
             "patient_name": patient_name,
             "patient_email": patient_email,
-            "slot_time": new_slot_time
+            "slot_time": slot_label
         }
-        
-        return f"""Appointment rescheduled successfully!
 
-New Booking Details:
-- Patient: {patient_name}
-- Email: {patient_email}
-- New Time: {new_slot_time}
-- New Booking ID: {new_invitee_uuid}
+        try:
+            await service.cancel_invitee(current_booking_uuid, current_scheduled_event_uuid)
+        except Exception as e:
+            print(f"Reschedule: new booking {new_invitee_uuid} created but cancelling {current_booking_uuid} failed: {str(e)}")
+            return record_result("booking", f"""Error: The new appointment at {slot_label} is booked (Booking ID: {new_invitee_uuid}, Scheduled event ID: {result['scheduled_event_uuid']}), but the old appointment could not be cancelled automatically. Please cancel booking {current_booking_uuid} or call the clinic.""", result)
 
-You will receive a confirmation email.
+        return record_result("reschedule", f"""Appointment rescheduled successfully.
+New Time: {slot_label}
+New Booking ID: {new_invitee_uuid}
+Scheduled event ID: {result['scheduled_event_uuid']}
+A confirmation email will be sent to {patient_email}.""", result)
 
-BOOKING_DATA: {json.dumps(result)}"""
-    
     except Exception as e:
         return f"Error rescheduling appointment: {str(e)}"
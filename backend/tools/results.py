@@ -0,0 +1,49 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class ToolResult:
+    kind: str
+    summary: str
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ToolContext:
+    booking_data: Dict[str, Any] = field(default_factory=dict)
+    results: List[ToolResult] = field(default_factory=list)
+
+
+_tool_context: ContextVar[Optional[ToolContext]] = ContextVar("tool_context", default=None)
+
+
+def start_tool_context(booking_data: Dict[str, Any]) -> ToolContext:
+    context = ToolContext(booking_data=booking_data)
+    _tool_context.set(context)
+    return context
+
+
+def end_tool_context():
+    _tool_context.set(None)
+
+
+def current_booking_data() -> Dict[str, Any]:
+    context = _tool_context.get()
+    return context.booking_data if context is not None else {}
+
+
+def current_results() -> List[ToolResult]:
+    context = _tool_context.get()
+    return context.results if context is not None else []
+
+
+def record_result(kind: str, summary: str, data: Dict[str, Any]) -> str:
+    context = _tool_context.get()
+    if context is not None:
+        context.results.append(ToolResult(kind=kind, summary=summary, data=data))
+        if kind == "availability":
+            # Later tool calls in the same turn book from these slots.
+            context.booking_data["offered_slots"] = data.get("slots", [])
+    return summary
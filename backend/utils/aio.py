@@ -0,0 +1,30 @@
+from typing import Any, Awaitable, List, Optional
+import asyncio
+
+
+async def gather_or_cancel(*aws: Awaitable[Any]) -> List[Any]:
+    """Run awaitables concurrently and return their results in order.
+
+    Unlike asyncio.gather, the first failure cancels the remaining tasks
+    before the exception is re-raised, so no request is left running in
+    the background after a tool has already given up.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    failed: Optional[asyncio.Task] = None
+    for task in tasks:
+        if task in done and not task.cancelled() and task.exception() is not None:
+            failed = failed or task
+    if failed is not None:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise failed.exception()
+    return [task.result() for task in tasks]
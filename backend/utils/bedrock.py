@@ -0,0 +1,273 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+from botocore.config import Config
+from langchain_aws import BedrockEmbeddings, ChatBedrock
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+import boto3
+
+LANE_PRIORITIES = {"booking": 0, "default": 1, "faq": 2}
+
+THROTTLING_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException"}
+
+bedrock_lane: ContextVar[str] = ContextVar("bedrock_lane", default="default")
+
+# Set when a token was already taken on the event loop for the next attempt.
+_prepaid: ContextVar[bool] = ContextVar("bedrock_prepaid", default=False)
+
+# Polling interval for async waiters that are not at the head of the queue.
+ASYNC_POLL_SECONDS = 0.05
+
+
+class BedrockRateLimitExceeded(Exception):
+    pass
+
+
+@contextmanager
+def bedrock_priority(lane: str):
+    token = bedrock_lane.set(lane)
+    try:
+        yield
+    finally:
+        bedrock_lane.reset(token)
+
+
+class AdaptiveRateLimiter:
+    """Token bucket shared by every Bedrock call in the process.
+
+    The fill rate grows additively on successful calls and is cut
+    multiplicatively on throttling, so it settles just under the account
+    quota. Waiters are served strictly by lane priority, then arrival order.
+    """
+
+    def __init__(self, rate: float = 5.0, burst: float = 10.0, min_rate: float = 0.5,
+                 max_rate: float = 50.0, increase: float = 0.1, decrease: float = 0.7,
+                 max_wait: float = 30.0, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.max_wait = max_wait
+        self._clock = clock
+        self._tokens = self.burst
+        self._last_refill = clock()
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        self.acquired = 0
+        self.timeouts = 0
+        self.throttles = 0
+        self.successes = 0
+        self.total_wait_seconds = 0.0
+        self.lane_counts: Dict[str, int] = {}
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _enqueue(self, lane: Optional[str]):
+        lane = lane or bedrock_lane.get()
+        entry = (LANE_PRIORITIES.get(lane, LANE_PRIORITIES["default"]), next(self._seq))
+        started = self._clock()
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+        return lane, entry, started, started + self.max_wait
+
+    def _poll(self, lane: str, entry: tuple, started: float, deadline: float) -> Optional[float]:
+        """Take a token if it is entry's turn; otherwise return how long to wait. Call with the lock held."""
+        self._refill()
+        if self._waiters[0] == entry and self._tokens >= 1:
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            self.acquired += 1
+            self.total_wait_seconds += self._clock() - started
+            self.lane_counts[lane] = self.lane_counts.get(lane, 0) + 1
+            self._cond.notify_all()
+            return None
+
+        remaining = deadline - self._clock()
+        if remaining <= 0:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            self.timeouts += 1
+            self._cond.notify_all()
+            raise BedrockRateLimitExceeded(
+                f"Too many requests: waited {self.max_wait:g}s for Bedrock capacity"
+            )
+        if self._waiters[0] == entry:
+            return min(remaining, (1 - self._tokens) / self.rate)
+        return remaining
+
+    def _cancel(self, entry: tuple):
+        with self._cond:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def acquire(self, lane: Optional[str] = None):
+        """Blocking acquire, used for botocore retries inside worker threads."""
+        lane, entry, started, deadline = self._enqueue(lane)
+        with self._cond:
+            while True:
+                wait = self._poll(lane, entry, started, deadline)
+                if wait is None:
+                    return
+                self._cond.wait(wait)
+
+    async def acquire_async(self, lane: Optional[str] = None):
+        """Wait for a token on the event loop, so queued calls hold no thread."""
+        lane, entry, started, deadline = self._enqueue(lane)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._poll(lane, entry, started, deadline)
+                if wait is None:
+                    return
+                await asyncio.sleep(min(wait, ASYNC_POLL_SECONDS))
+        except asyncio.CancelledError:
+            self._cancel(entry)
+            raise
+
+    def record_success(self):
+        with self._cond:
+            self.successes += 1
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_throttle(self):
+        with self._cond:
+            self.throttles += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            self._refill()
+            return {
+                "rate": round(self.rate, 3),
+                "tokens": round(self._tokens, 3),
+                "waiting": len(self._waiters),
+                "acquired": self.acquired,
+                "successes": self.successes,
+                "throttles": self.throttles,
+                "timeouts": self.timeouts,
+                "avg_wait_seconds": self.total_wait_seconds / self.acquired if self.acquired else 0.0,
+                "by_lane": dict(self.lane_counts)
+            }
+
+
+bedrock_limiter = AdaptiveRateLimiter(
+    rate=float(os.getenv("BEDROCK_RATE_LIMIT", "5")),
+    burst=float(os.getenv("BEDROCK_BURST", "10")),
+    min_rate=float(os.getenv("BEDROCK_MIN_RATE", "0.5")),
+    max_rate=float(os.getenv("BEDROCK_MAX_RATE", "50")),
+    max_wait=float(os.getenv("BEDROCK_MAX_WAIT", "30"))
+)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+bedrock_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("BEDROCK_MAX_WORKERS", os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "20"))),
+    thread_name_prefix="bedrock"
+)
+
+
+def _before_send(**kwargs):
+    if _prepaid.get():
+        _prepaid.set(False)
+        return
+    bedrock_limiter.acquire()
+
+
+async def run_bedrock_call(func: Callable, *args: Any, **kwargs: Any):
+    """Run a blocking Bedrock call on bedrock_executor.
+
+    The first attempt's token is taken on the event loop before dispatch, so
+    calls queued behind the limiter occupy no thread and higher-priority
+    lanes are never stuck behind them waiting for a worker.
+    """
+    await bedrock_limiter.acquire_async()
+    context = copy_context()
+    context.run(_prepaid.set, True)
+    return await asyncio.get_running_loop().run_in_executor(bedrock_executor, partial(context.run, func, *args, **kwargs))
+
+
+class RateLimitedChatBedrock(ChatBedrock):
+    """ChatBedrock whose async calls run through run_bedrock_call."""
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return await run_bedrock_call(self._generate, messages, stop, run_manager.get_sync() if run_manager else None, **kwargs)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await bedrock_limiter.acquire_async()
+        context = copy_context()
+        context.run(_prepaid.set, True)
+        loop = asyncio.get_running_loop()
+        iterator = context.run(self._stream, messages, stop, run_manager.get_sync() if run_manager else None, **kwargs)
+        done = object()
+        while True:
+            item = await loop.run_in_executor(bedrock_executor, context.run, next, iterator, done)
+            if item is done:
+                break
+            yield item
+
+
+class RateLimitedBedrockEmbeddings(BedrockEmbeddings):
+    """BedrockEmbeddings whose async calls run through run_bedrock_call."""
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await run_bedrock_call(self.embed_query, text)
+
+
+def _after_attempt(response=None, **kwargs):
+    if response is None:
+        return None
+    http_response, parsed = response
+    code = parsed.get("Error", {}).get("Code") if isinstance(parsed, dict) else None
+    if http_response.status_code == 429 or code in THROTTLING_CODES:
+        bedrock_limiter.record_throttle()
+    elif http_response.status_code < 400:
+        bedrock_limiter.record_success()
+    return None
+
+
+def create_bedrock_client():
+    config = Config(
+        retries={
+            'max_attempts': int(os.getenv("BEDROCK_MAX_ATTEMPTS", "4")),
+            'mode': 'standard'
+        },
+        max_pool_connections=int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "20"))
+    )
+    client = boto3.client(
+        service_name='bedrock-runtime',
+        region_name=os.getenv("AWS_REGION", "us-east-1"),
+        config=config
+    )
+    # before-send and needs-retry fire once per HTTP attempt, so retries are
+    # paced by the shared bucket too.
+    client.meta.events.register("before-send.bedrock-runtime", _before_send)
+    client.meta.events.register("needs-retry.bedrock-runtime", _after_attempt)
+    return client
+
+
+def get_bedrock_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_bedrock_client()
+    return _client
@@ -0,0 +1,174 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+import re
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+ID_SEGMENT = re.compile(r"^[0-9a-fA-F-]{16,}$|^[A-Za-z0-9]{16,}$")
+
+Sample = Tuple[Dict[str, str], float]
+Family = Tuple[str, str, str, Iterable[Sample]]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def normalize_path(path: str) -> str:
+    """Collapse UUIDs in an API path so it can be used as a label."""
+    return "/".join("{id}" if ID_SEGMENT.match(part) else part for part in path.split("/"))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Registry:
+    """Holds metrics plus collectors that are read at scrape time."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help_text, labelnames, buckets))
+
+    def collector(self, collect: Callable[[], Iterable[Family]]):
+        """Register a callable returning (name, help, type, samples) families, called once per scrape."""
+        self._collectors.append(collect)
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], Iterable[Sample]]):
+        self.collector(lambda: [(name, help_text, "gauge", collect())])
+
+    def counter_func(self, name: str, help_text: str, collect: Callable[[], Iterable[Sample]]):
+        """A counter whose values are read from elsewhere, e.g. a stats() dict."""
+        self.collector(lambda: [(name, help_text, "counter", collect())])
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                families = [(name, help_text, kind, list(samples)) for name, help_text, kind, samples in collect()]
+            except Exception as e:
+                print(f"Metrics collector {getattr(collect, '__name__', collect)} failed: {str(e)}")
+                continue
+            for name, help_text, kind, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "http_request_seconds", "HTTP request latency by route", ["route", "method", "status"]
+)
+llm_call_seconds = registry.histogram(
+    "llm_call_seconds", "Latency of a single chat model call", ["model", "status"]
+)
+agent_llm_rounds = registry.histogram(
+    "agent_llm_rounds", "Chat model calls per agent turn", buckets=(0, 1, 2, 3, 4, 5, 8, 13)
+)
+tool_seconds = registry.histogram(
+    "tool_seconds", "Tool execution latency", ["tool", "status"]
+)
+calendly_request_seconds = registry.histogram(
+    "calendly_request_seconds", "Calendly API latency by endpoint", ["method", "endpoint", "status"]
+)
+faq_stage_seconds = registry.histogram(
+    "faq_stage_seconds", "FAQ lookup latency by stage", ["stage"]
+)
+chat_queue_wait_seconds = registry.histogram(
+    "chat_queue_wait_seconds", "Time a chat turn waited for an admission slot"
+)
+chat_turns_total = registry.counter(
+    "chat_turns_total", "Chat turns by how they were answered", ["path"]
+)
+agent_tokens_total = registry.counter(
+    "agent_tokens_total", "Tokens used by scheduling agent turns", ["kind"]
+)
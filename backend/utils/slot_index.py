@@ -0,0 +1,173 @@
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+import re
+import numpy as np
+
+TIME_OF_DAY_MINUTES = {
+    "morning": (0, 12 * 60),
+    "afternoon": (12 * 60, 17 * 60),
+    "evening": (17 * 60, 24 * 60)
+}
+
+# A time needs minutes or an AM/PM marker, so "2 weeks" is not read as 02:00.
+PREFERRED_TIME = re.compile(
+    r"(?:(\d{4}-\d{2}-\d{2})[ T]+)?(?<![\d-])(\d{1,2})(?:(?::(\d{2}))\s*([ap]\.?m\.?)?|\s*([ap]\.?m\.?))(?![a-z])",
+    re.I
+)
+
+# Clinic hours: "3:30" without AM/PM means the afternoon.
+AFTERNOON_HOURS = range(1, 8)
+
+
+def parse_epochs(start_times: Sequence[str]) -> np.ndarray:
+    """UTC epoch seconds for Calendly start_time strings."""
+    if not start_times:
+        return np.zeros(0, dtype=np.int64)
+    if all(value.endswith("Z") for value in start_times):
+        try:
+            return np.array([value[:-1] for value in start_times], dtype="datetime64[s]").astype(np.int64)
+        except ValueError:
+            pass
+    return np.array([
+        int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+        for value in start_times
+    ], dtype=np.int64)
+
+
+def local_offsets(epochs: np.ndarray, tz: ZoneInfo) -> np.ndarray:
+    """UTC offset in seconds for each epoch, looked up once per distinct hour."""
+    hours, inverse = np.unique(epochs // 3600, return_inverse=True)
+    offsets = np.array([
+        int(datetime.fromtimestamp(int(hour) * 3600, tz).utcoffset().total_seconds())
+        for hour in hours
+    ], dtype=np.int64)
+    return offsets[inverse]
+
+
+def parse_preferred_time(value: str, tz: ZoneInfo) -> Tuple[Optional[int], Optional[int]]:
+    """Returns (minute of day, epoch); epoch is set only when a date was given."""
+    match = PREFERRED_TIME.search(value or "")
+    if not match:
+        return None, None
+    hour = int(match.group(2))
+    minute = int(match.group(3) or 0)
+    meridiem = (match.group(4) or match.group(5) or "").lower().replace(".", "")
+    if not meridiem and hour in AFTERNOON_HOURS:
+        meridiem = "pm"
+    if meridiem and not 1 <= hour <= 12:
+        return None, None
+    if meridiem == "pm" and hour < 12:
+        hour += 12
+    elif meridiem == "am" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None, None
+    epoch = None
+    if match.group(1):
+        day = datetime.fromisoformat(match.group(1))
+        epoch = int(day.replace(hour=hour, minute=minute, tzinfo=tz).timestamp())
+    return hour * 60 + minute, epoch
+
+
+class SlotIndex:
+    """Columnar index of available slots in the clinic timezone.
+
+    Holds one row per (event type, start time), sorted by start time and
+    then by event type order, with local day, minute of day and weekday
+    precomputed so filtering and ranking never touch datetime objects.
+    Only rows that are returned get formatted.
+    """
+
+    def __init__(self, event_type_uris: Sequence[str], epochs: np.ndarray, type_codes: np.ndarray, timezone: str):
+        self.event_type_uris = list(event_type_uris)
+        self.timezone = timezone
+        self.tz = ZoneInfo(timezone)
+        order = np.lexsort((type_codes, epochs))
+        self.epochs = epochs[order]
+        self.type_codes = type_codes[order].astype(np.int16)
+        local = self.epochs + local_offsets(self.epochs, self.tz)
+        self.local_day = (local // 86400).astype(np.int32)
+        self.minute_of_day = ((local % 86400) // 60).astype(np.int16)
+        self.weekday = ((self.local_day + 3) % 7).astype(np.int8)
+
+    @classmethod
+    def from_windows(cls, event_type_uris: Sequence[str], windows: Sequence[Tuple[str, List[Dict]]], timezone: str) -> "SlotIndex":
+        """Build from (event_type_uri, slots) pairs, dropping duplicate rows."""
+        codes = {uri: position for position, uri in enumerate(dict.fromkeys(event_type_uris))}
+        start_times, type_codes = [], []
+        for event_type_uri, slots in windows:
+            code = codes[event_type_uri]
+            for slot in slots:
+                if isinstance(slot, dict) and slot.get("start_time"):
+                    start_times.append(slot["start_time"])
+                    type_codes.append(code)
+        epochs = parse_epochs(start_times)
+        type_codes = np.array(type_codes, dtype=np.int64)
+        if len(epochs):
+            _, unique_rows = np.unique(np.stack([epochs, type_codes]), axis=1, return_index=True)
+            epochs, type_codes = epochs[unique_rows], type_codes[unique_rows]
+        return cls(list(codes), epochs, type_codes, timezone)
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def query(self, start_epoch: Optional[int] = None, end_epoch: Optional[int] = None,
+              time_preference: str = "any", event_type_uris: Optional[Sequence[str]] = None,
+              weekdays: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Row numbers matching every filter, in index order."""
+        lo = 0 if start_epoch is None else int(np.searchsorted(self.epochs, start_epoch, side="left"))
+        hi = len(self.epochs) if end_epoch is None else int(np.searchsorted(self.epochs, end_epoch, side="left"))
+        mask = np.ones(hi - lo, dtype=bool)
+        if time_preference in TIME_OF_DAY_MINUTES:
+            first, last = TIME_OF_DAY_MINUTES[time_preference]
+            minutes = self.minute_of_day[lo:hi]
+            mask &= (minutes >= first) & (minutes < last)
+        if event_type_uris is not None:
+            codes = [self.event_type_uris.index(uri) for uri in event_type_uris if uri in self.event_type_uris]
+            mask &= np.isin(self.type_codes[lo:hi], codes)
+        if weekdays is not None:
+            mask &= np.isin(self.weekday[lo:hi], list(weekdays))
+        return np.flatnonzero(mask) + lo
+
+    def nearest(self, rows: np.ndarray, minute_of_day: Optional[int] = None, epoch: Optional[int] = None, n: int = 10) -> np.ndarray:
+        """The n rows closest to a preferred time, returned in index order.
+
+        With an epoch, distance is absolute; otherwise it is the distance in
+        time of day, with earlier dates winning ties.
+        """
+        if len(rows) == 0 or (minute_of_day is None and epoch is None):
+            return rows[:n]
+        if epoch is not None:
+            distance = np.abs(self.epochs[rows] - epoch)
+        else:
+            distance = np.abs(self.minute_of_day[rows].astype(np.int32) - minute_of_day)
+        chosen = rows[np.lexsort((rows, distance))[:n]]
+        return np.sort(chosen)
+
+    def limit_per_day(self, rows: np.ndarray, max_days: int, per_day: int) -> np.ndarray:
+        """Keep the first per_day distinct times on each of the first max_days dates."""
+        if len(rows) == 0:
+            return rows
+        keys = self.local_day[rows].astype(np.int64) * 1440 + self.minute_of_day[rows]
+        unique_keys = np.unique(keys)
+        days = unique_keys // 1440
+        _, day_starts, day_index = np.unique(days, return_index=True, return_inverse=True)
+        rank = np.arange(len(unique_keys)) - day_starts[day_index]
+        kept = unique_keys[(rank < per_day) & (day_index < max_days)]
+        return rows[np.isin(keys, kept)]
+
+    def slot(self, row: int) -> Dict:
+        local = datetime.fromtimestamp(int(self.epochs[row]), self.tz)
+        return {
+            "local_time": local,
+            "start_time": datetime.fromtimestamp(int(self.epochs[row]), dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "event_type_uri": self.event_type_uris[int(self.type_codes[row])]
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "slots": len(self),
+            "event_types": len(self.event_type_uris),
+            "bytes": int(self.epochs.nbytes + self.type_codes.nbytes + self.local_day.nbytes + self.minute_of_day.nbytes + self.weekday.nbytes)
+        }
@@ -0,0 +1,140 @@
+"""Compare query latency and memory of the Chroma and NumPy FAQ retrievers.
+
+Runs each backend in its own subprocess so resident memory is measured
+in isolation. Embeddings are deterministic fakes, so no AWS access is
+needed.
+
+    python -m benchmarks.bench_vector_store --docs 28 --queries 2000
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKENDS = ["numpy", "chroma"]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_corpus(n_docs):
+    from backend.rag.indexer import load_clinic_documents
+    from langchain.schema import Document
+
+    documents = load_clinic_documents() or []
+    i = 0
+    while len(documents) < n_docs:
+        documents.append(Document(page_content=f"Synthetic clinic note {i}", metadata={"source": "synthetic"}))
+        i += 1
+    return documents[:n_docs]
+
+
+def run_backend(backend, n_docs, n_queries, dim, k, batch):
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    embeddings = DeterministicFakeEmbedding(size=dim)
+    documents = build_corpus(n_docs)
+    queries = [f"question {i % 50}" for i in range(n_queries)]
+    query_vectors = [embeddings.embed_query(q) for q in queries]
+    directory = tempfile.mkdtemp(prefix=f"bench-{backend}-")
+
+    rss_before = rss_mb()
+    tracemalloc.start()
+    start = time.perf_counter()
+    if backend == "numpy":
+        from backend.rag.numpy_store import NumpyVectorStore
+        store = NumpyVectorStore.from_documents(documents, embeddings, persist_directory=directory)
+        store = NumpyVectorStore(embeddings, persist_directory=directory)
+    else:
+        from langchain_community.vectorstores import Chroma
+        store = Chroma.from_documents(documents, embeddings, persist_directory=directory)
+    build_seconds = time.perf_counter() - start
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    for vector in query_vectors:
+        t0 = time.perf_counter()
+        store.similarity_search_by_vector(vector, k=k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    batch_ms = None
+    if backend == "numpy" and batch:
+        t0 = time.perf_counter()
+        store.batch_search_by_vector(query_vectors, k=k)
+        batch_ms = (time.perf_counter() - t0) * 1000
+
+    result = {
+        "backend": backend,
+        "docs": n_docs,
+        "queries": n_queries,
+        "dim": dim,
+        "build_seconds": round(build_seconds, 4),
+        "query_ms_p50": round(statistics.median(latencies), 4),
+        "query_ms_p95": round(percentile(latencies, 95), 4),
+        "query_ms_p99": round(percentile(latencies, 99), 4),
+        "batch_total_ms": round(batch_ms, 4) if batch_ms is not None else None,
+        "build_python_peak_mb": round(peak_traced / 1024 / 1024, 3),
+        "rss_delta_mb": round(rss_mb() - rss_before, 3)
+    }
+    shutil.rmtree(directory, ignore_errors=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=BACKENDS, help="Run a single backend in this process")
+    parser.add_argument("--docs", type=int, default=28)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--no-batch", action="store_true")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.backend:
+        result = run_backend(args.backend, args.docs, args.queries, args.dim, args.k, not args.no_batch)
+        print(json.dumps(result))
+        return
+
+    results = []
+    for backend in BACKENDS:
+        command = [sys.executable, "-m", "benchmarks.bench_vector_store", "--backend", backend,
+                   "--docs", str(args.docs), "--queries", str(args.queries), "--dim", str(args.dim), "--k", str(args.k)]
+        if args.no_batch:
+            command.append("--no-batch")
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{backend}: failed\n{completed.stderr.strip()}", file=sys.stderr)
+            continue
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    for result in results:
+        print(f"{result['backend']:>7}: build {result['build_seconds']}s, "
+              f"p50 {result['query_ms_p50']}ms, p95 {result['query_ms_p95']}ms, p99 {result['query_ms_p99']}ms, "
+              f"rss +{result['rss_delta_mb']}MB, build python peak {result['build_python_peak_mb']}MB")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
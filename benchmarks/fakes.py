@@ -0,0 +1,189 @@
+"""Local stand-ins for Bedrock and Calendly used by the load harness.
+
+ScriptedChatModel replaces ChatBedrock: it answers tool-calling turns from
+a list of regex rules and echoes tool output back as the final reply.
+FakeCalendly is an in-process Calendly API served through
+httpx.MockTransport, with configurable latency and error rate.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class ScriptedChatModel(BaseChatModel):
+    rules: List[Any] = []
+    latency: float = 0.0
+    default_reply: str = "Sure, I can help with that. Which appointment type and date would suit you?"
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages) -> AIMessage:
+        self.calls += 1
+        last = messages[-1]
+        if last.type == "tool":
+            return AIMessage(content=f"Done. {last.content}")
+
+        human = [m for m in messages if m.type == "human"]
+        text = human[-1].content if human else ""
+        for pattern, tool_name, build_args in self.rules:
+            match = re.search(pattern, text, re.I)
+            if match:
+                return AIMessage(content="", tool_calls=[{
+                    "name": tool_name,
+                    "args": build_args(match, messages),
+                    "id": f"call_{self.calls}"
+                }])
+        return AIMessage(content=self.default_reply)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+
+ID_SEGMENT = re.compile(r"[0-9a-f-]{36}|\d+MIN")
+
+EVENT_TYPES = [
+    ("30min", "General Consultation"),
+    ("15min", "Follow-up"),
+    ("45min", "Physical Exam"),
+    ("60min", "Specialist Consultation"),
+]
+
+
+class FakeCalendly:
+    base_url = "https://api.calendly.com"
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, tz: str = "Asia/Kolkata",
+                 open_hours: Tuple[int, int] = (10, 17), seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.tz = ZoneInfo(tz)
+        self.open_hours = open_hours
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.errors = 0
+        self.event_types = [
+            {
+                "uri": f"{self.base_url}/event_types/{slug.upper()}",
+                "name": f"{slug} {label}",
+                "duration": int(slug[:-3]),
+                "locations": [{"kind": "physical", "location": "Suite 400"}]
+            }
+            for slug, label in EVENT_TYPES
+        ]
+        self.events: Dict[str, Dict] = {}
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def _slots(self, start: datetime, end: datetime) -> List[Dict]:
+        slots = []
+        day = start.astimezone(self.tz).date()
+        while day <= end.astimezone(self.tz).date():
+            for hour in range(*self.open_hours):
+                for minute in (0, 30):
+                    slot = datetime.combine(day, dtime(hour, minute), self.tz)
+                    if start <= slot < end:
+                        slots.append({
+                            "status": "available",
+                            "start_time": slot.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+                        })
+            day += timedelta(days=1)
+        return slots
+
+    @staticmethod
+    def _parse(value: str) -> datetime:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        route = "/".join("{id}" if ID_SEGMENT.fullmatch(part) else part for part in path.split("/"))
+        self.calls[f"{request.method} {route}"] += 1
+
+        if self.latency:
+            await asyncio.sleep(self.random.uniform(0.5, 1.5) * self.latency)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return httpx.Response(503, json={"title": "Service Unavailable"})
+
+        if path == "/users/me":
+            return httpx.Response(200, json={"resource": {"uri": f"{self.base_url}/users/ME"}})
+        if path == "/event_types":
+            return httpx.Response(200, json={"collection": self.event_types})
+        if path.startswith("/event_types/"):
+            uri = f"{self.base_url}{path}"
+            for event_type in self.event_types:
+                if event_type["uri"] == uri:
+                    return httpx.Response(200, json={"resource": event_type})
+            return httpx.Response(404, json={"title": "Resource Not Found"})
+        if path == "/event_type_available_times":
+            params = request.url.params
+            slots = self._slots(self._parse(params["start_time"]), self._parse(params["end_time"]))
+            return httpx.Response(200, json={"collection": slots})
+        if path == "/invitees" and request.method == "POST":
+            return self._book(request)
+        if path.startswith("/scheduled_events/") and path.endswith("/cancellation"):
+            event_uuid = path.split("/")[2]
+            if event_uuid not in self.events:
+                return httpx.Response(404, json={"title": "Resource Not Found"})
+            self.events[event_uuid]["status"] = "canceled"
+            return httpx.Response(201, json={"resource": {"canceled_by": "patient"}})
+        if path.startswith("/scheduled_events/") and request.method == "GET":
+            event = self.events.get(path.split("/")[2])
+            if event is None:
+                return httpx.Response(404, json={"title": "Resource Not Found"})
+            return httpx.Response(200, json={"resource": event})
+        return httpx.Response(404, json={"title": "Resource Not Found"})
+
+    def _book(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        event_uuid = str(uuid.UUID(int=self.random.getrandbits(128)))
+        invitee_uuid = str(uuid.UUID(int=self.random.getrandbits(128)))
+        event_uri = f"{self.base_url}/scheduled_events/{event_uuid}"
+        self.events[event_uuid] = {
+            "uri": event_uri,
+            "event_type": payload["event_type"],
+            "start_time": payload["start_time"],
+            "status": "active"
+        }
+        return httpx.Response(201, json={"resource": {
+            "uri": f"{event_uri}/invitees/{invitee_uuid}",
+            "event": event_uri,
+            "email": payload["invitee"]["email"],
+            "name": payload["invitee"]["name"],
+            "status": "active",
+            "cancel_url": f"https://calendly.com/cancellations/{invitee_uuid}",
+            "reschedule_url": f"https://calendly.com/reschedulings/{invitee_uuid}"
+        }})
+
+
+def next_weekday(days_ahead: int = 14) -> date:
+    day = date.today() + timedelta(days=days_ahead)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
@@ -0,0 +1,227 @@
+"""Replay scripted conversations against /api/chat with local fakes.
+
+Bedrock is replaced by a scripted chat model, embeddings by the hashing
+embedder and Calendly by an in-process mock, so no AWS or Calendly
+account is needed. Results can be written as JSON and compared between runs.
+
+    python -m benchmarks.load_test --conversations 200 --concurrency 16 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.bench_vector_store import percentile
+from benchmarks.fakes import FakeCalendly, ScriptedChatModel, next_weekday
+
+KINDS = ["booking", "reschedule", "cancel", "faq"]
+
+SLOT = r"(\d{4}-\d{2}-\d{2} \d{1,2}:\d{2} [AP]M)"
+
+COMPARED_METRICS = [
+    "turn_ms_p50", "turn_ms_p95", "turn_ms_p99", "turns_per_second",
+    "calendly_calls_per_turn", "llm_calls_per_turn", "embedded_texts_per_turn",
+    "error_rate", "peak_rss_mb"
+]
+
+
+def last_match(pattern, messages):
+    for message in reversed(messages):
+        found = re.findall(pattern, str(message.content))
+        if found:
+            return found[-1]
+    return ""
+
+
+def agent_rules():
+    return [
+        (rf"book {SLOT} for ([^,]+), (\S+@\S+)", "book_appointment_tool", lambda m, msgs: {
+            "slot_time": m.group(1), "patient_name": m.group(2), "patient_email": m.group(3)
+        }),
+        (rf"reschedule my appointment to {SLOT}", "reschedule_appointment_tool", lambda m, msgs: {
+            "current_booking_uuid": last_match(r"Booking ID: (\S+)", msgs),
+            "current_scheduled_event_uuid": last_match(r"Scheduled event ID: (\S+)", msgs),
+            "new_slot_time": m.group(1),
+            "patient_email": last_match(r"[\w.+-]+@[\w-]+\.\w+", msgs),
+            "patient_name": last_match(r"for (Patient \d+)", msgs)
+        }),
+        (r"cancel my appointment", "cancel_appointment_tool", lambda m, msgs: {
+            "booking_uuid": last_match(r"Booking ID: (\S+)", msgs),
+            "scheduled_event_uuid": last_match(r"Scheduled event ID: (\S+)", msgs),
+            "cancellation_reason": "Schedule conflict"
+        }),
+        (r"(\d{4}-\d{2}-\d{2})", "get_availability_tool", lambda m, msgs: {
+            "date_preference": m.group(1), "appointment_type": "General Consultation"
+        }),
+        (r"prepare|bring", "search_faq_tool", lambda m, msgs: {"question": msgs[-1].content}),
+    ]
+
+
+def conversation(kind, index):
+    day = next_weekday(14 + index % 5).isoformat()
+    other_day = next_weekday(15 + index % 5).isoformat()
+    booking = [
+        "Hello",
+        f"What General Consultation slots are available on {day}?",
+        f"Please book {day} 10:30 AM for Patient {index}, patient{index}@example.com",
+    ]
+    if kind == "booking":
+        return booking + ["Thanks"]
+    if kind == "reschedule":
+        return booking + [f"Something came up, please reschedule my appointment to {other_day} 02:00 PM"]
+    if kind == "cancel":
+        return booking + ["Please cancel my appointment"]
+    return [
+        "What are your clinic hours?",
+        "Do you accept insurance?",
+        "How should I prepare for my first visit and what should I bring?",
+        "Where can I park?",
+    ]
+
+
+def configure_environment(args, workdir):
+    os.environ.update({
+        "CALENDLY_API_KEY": "benchmark",
+        "EMBEDDING_PROVIDER": "hashing",
+        "EMBEDDING_CACHE_PATH": "",
+        "VECTOR_STORE_BACKEND": "numpy",
+        "NUMPY_INDEX_DIRECTORY": os.path.join(workdir, "index"),
+        "SESSION_BACKEND": "memory",
+        "AGENT_TRACE_SAMPLE_RATE": "0",
+        "INTENT_ROUTER_ENABLED": "false" if args.no_router else "true",
+        "CHAT_MAX_CONCURRENCY": str(args.server_concurrency),
+        "AWS_REGION": os.getenv("AWS_REGION", "us-east-1"),
+    })
+
+
+async def run(args):
+    import httpx
+    from backend.main import app
+    from backend.agent.scheduling_agent import agent_instance
+    from backend.api.calendly_integration import open_http_client, close_http_client
+    from backend.rag.embeddings import get_embeddings
+    from backend.rag.faq_rag import reload_rag_chain
+
+    calendly = FakeCalendly(latency=args.calendly_latency, error_rate=args.calendly_error_rate, seed=args.seed)
+    agent_llm = ScriptedChatModel(rules=agent_rules(), latency=args.llm_latency)
+    faq_llm = ScriptedChatModel(latency=args.llm_latency, default_reply="Here is what our clinic information says.")
+    agent_instance.use_llm(agent_llm)
+    await open_http_client(transport=calendly.transport())
+    await reload_rag_chain(llm=faq_llm)
+
+    calendly.calls.clear()
+    embedded_before = get_embeddings().stats().get("misses", 0)
+    latencies = defaultdict(list)
+    status_counts = defaultdict(int)
+    tool_errors = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def replay(client, kind, index):
+        nonlocal tool_errors
+        async with semaphore:
+            session_id = f"bench-{kind}-{index}"
+            for message in conversation(kind, index):
+                started = time.perf_counter()
+                response = await client.post("/api/chat", json={"message": message, "session_id": session_id})
+                latencies[kind].append((time.perf_counter() - started) * 1000)
+                status_counts[response.status_code] += 1
+                if response.status_code != 200:
+                    break
+                if "Error" in response.json()["response"]:
+                    tool_errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        with contextlib.redirect_stdout(io.StringIO() if not args.verbose else sys.stdout):
+            await asyncio.gather(*[
+                replay(client, KINDS[i % len(KINDS)] if args.kind == "mixed" else args.kind, i)
+                for i in range(args.conversations)
+            ])
+    elapsed = time.perf_counter() - started
+    await close_http_client()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    turns = len(all_latencies)
+    failed = sum(count for status, count in status_counts.items() if status != 200)
+    result = {
+        "conversations": args.conversations,
+        "concurrency": args.concurrency,
+        "turns": turns,
+        "elapsed_seconds": round(elapsed, 3),
+        "turns_per_second": round(turns / elapsed, 2),
+        "turn_ms_p50": round(statistics.median(all_latencies), 2),
+        "turn_ms_p95": round(percentile(all_latencies, 95), 2),
+        "turn_ms_p99": round(percentile(all_latencies, 99), 2),
+        "by_kind_ms_p50": {kind: round(statistics.median(values), 2) for kind, values in latencies.items()},
+        "status_codes": dict(status_counts),
+        "error_rate": round(failed / turns, 4),
+        "tool_errors": tool_errors,
+        "calendly_calls_per_turn": round(sum(calendly.calls.values()) / turns, 3),
+        "calendly_calls": dict(calendly.calls),
+        "calendly_injected_errors": calendly.errors,
+        "llm_calls_per_turn": round((agent_llm.calls + faq_llm.calls) / turns, 3),
+        "embedded_texts_per_turn": round((get_embeddings().stats().get("misses", 0) - embedded_before) / turns, 3),
+        "router": agent_instance.router.stats(),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "settings": {
+            "kind": args.kind,
+            "llm_latency": args.llm_latency,
+            "calendly_latency": args.calendly_latency,
+            "calendly_error_rate": args.calendly_error_rate,
+            "router": not args.no_router
+        }
+    }
+    return result
+
+
+def compare(baseline, result):
+    print(f"{'metric':<26}{'baseline':>12}{'current':>12}{'change':>10}")
+    for metric in COMPARED_METRICS:
+        old, new = baseline.get(metric), result.get(metric)
+        if old is None or new is None:
+            continue
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"{metric:<26}{old:>12}{new:>12}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8, help="Conversations replayed at once")
+    parser.add_argument("--kind", choices=KINDS + ["mixed"], default="mixed")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per fake model call")
+    parser.add_argument("--calendly-latency", type=float, default=0.0, help="Mean seconds per fake Calendly call")
+    parser.add_argument("--calendly-error-rate", type=float, default=0.0)
+    parser.add_argument("--server-concurrency", type=int, default=64, help="CHAT_MAX_CONCURRENCY for the app")
+    parser.add_argument("--no-router", action="store_true", help="Send every turn to the agent")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's own stdout logging")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-load-") as workdir:
+        configure_environment(args, workdir)
+        result = asyncio.run(run(args))
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
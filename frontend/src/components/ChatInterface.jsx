@@ -14,34 +14,114 @@ function ChatInterface({ onBookingComplete }) {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
   }, [messages])
 
+  const updateLastMessage = (updates) => {
+    setMessages(prev => {
+      const next = [...prev]
+      next[next.length - 1] = { ...next[next.length - 1], ...updates }
+      return next
+    })
+  }
+
+  const handleFinal = (data) => {
+    updateLastMessage({ content: data.response, status: null, streaming: false })
+    if (data.booking_details) {
+      onBookingComplete(data.booking_details)
+    }
+  }
+
+  const openStream = async (userMessage) => {
+    try {
+      const response = await fetch('/api/chat/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ message: userMessage, session_id: sessionId })
+      })
+      if (response.status === 429 || response.status === 503) {
+        const error = new Error('busy')
+        throw error
+      }
+      return response.ok && response.body ? response : null
+    } catch (error) {
+      if (error.message === 'busy') throw error
+      return null
+    }
+  }
+
+  const readStream = async (response) => {
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    let text = ''
+    let finished = false
+
+    while (!finished) {
+      const { value, done } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+
+      let boundary
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const raw = buffer.slice(0, boundary)
+        buffer = buffer.slice(boundary + 2)
+        const eventLine = raw.split('\n').find(line => line.startsWith('event: '))
+        const dataLine = raw.split('\n').find(line => line.startsWith('data: '))
+        if (!eventLine || !dataLine) continue
+
+        const event = eventLine.slice(7)
+        const data = JSON.parse(dataLine.slice(6))
+        if (event === 'token') {
+          text += data.text
+          updateLastMessage({ content: text })
+        } else if (event === 'progress') {
+          text = ''
+          updateLastMessage({ content: '', status: data.message })
+        } else if (event === 'final') {
+          handleFinal(data)
+          finished = true
+        } else if (event === 'error') {
+          throw new Error(data.detail)
+        }
+      }
+    }
+    return finished
+  }
+
   const sendMessage = async (e) => {
     e.preventDefault()
     if (!input.trim() || loading) return
 
     const userMessage = input.trim()
     setInput('')
-    setMessages(prev => [...prev, { role: 'user', content: userMessage }])
+    setMessages(prev => [
+      ...prev,
+      { role: 'user', content: userMessage },
+      { role: 'assistant', content: '', streaming: true }
+    ])
     setLoading(true)
 
     try {
-      const response = await axios.post('/api/chat', {
-        message: userMessage,
-        session_id: sessionId
-      })
-
-      setMessages(prev => [...prev, { 
-        role: 'assistant', 
-        content: response.data.response 
-      }])
-
-      if (response.data.booking_details) {
-        onBookingComplete(response.data.booking_details)
+      const stream = await openStream(userMessage)
+      if (stream) {
+        const finished = await readStream(stream)
+        if (!finished) {
+          throw new Error('Stream ended before the final response')
+        }
+      } else {
+        const response = await axios.post('/api/chat', {
+          message: userMessage,
+          session_id: sessionId
+        })
+        handleFinal(response.data)
       }
     } catch (error) {
-      setMessages(prev => [...prev, { 
-        role: 'assistant', 
-        content: 'Sorry, I encountered an error. Please try again.' 
-      }])
+      const busy = error.message === 'busy' || [429, 503].includes(error.response?.status)
+      updateLastMessage({
+        content: busy
+          ? "I'm handling a lot of requests right now. Please try again in a few seconds."
+          : 'Sorry, I encountered an error. Please try again.',
+        status: null,
+        streaming: false
+      })
     } finally {
       setLoading(false)
     }
@@ -55,16 +135,13 @@ function ChatInterface({ onBookingComplete }) {
             ...styles.message,
             ...(msg.role === 'user' ? styles.userMessage : styles.assistantMessage)
           }}>
-            <div style={styles.messageContent}>{msg.content}</div>
-          </div>
-        ))}
-        {loading && (
-          <div style={{...styles.message, ...styles.assistantMessage}}>
             <div style={styles.messageContent}>
-              <span style={styles.typing}>●●●</span>
+              {msg.content || (msg.streaming && (
+                <span style={styles.typing}>{msg.status || '●●●'}</span>
+              ))}
             </div>
           </div>
-        )}
+        ))}
         <div ref={messagesEndRef} />
       </div>
 
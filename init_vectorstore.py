@@ -1,6 +1,7 @@
-from backend.rag.vector_store import initialize_vector_store
+from backend.rag.vector_store import create_vector_store, sync_vector_store
 
 if __name__ == "__main__":
-    print("Initializing vector store...")
-    initialize_vector_store()
-    print("Vector store initialized successfully!")
+    print("Syncing vector store with data/clinic_info.json...")
+    summary = sync_vector_store(create_vector_store())
+    print(f"Vector store synced: {summary['added']} added, {summary['updated']} updated, "
+          f"{summary['deleted']} deleted, {summary['unchanged']} unchanged.")